@@ -4,13 +4,13 @@ Shorts Rocket - 금융 뉴스 자동화 쇼츠 생성기
 investing.com 크롤링 → 영상 생성 프롬프트 → 영상 생성 → 유튜브 업로드 자동화
 """
 from dataclasses import dataclass
+import hashlib
 import os
+import shelve
+import time
 import sys
 import json
-import logging
-from typing import List
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from typing import Iterable, Iterator, List
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -18,14 +18,34 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
-from src.crawler import YahooFinanceCrawler, yahoo_crawl_all
-from src.prompt_generator import VideoPromptGenerator, CharacterType
-from src.video_generator.video_generator import VeoGenerator
-from src.video_generator.editor import AutoEditor
-from src.uploader.youtube_upload_for_main import upload_video_to_youtube
+# 무거운 모듈(Playwright, MoviePy, Google API 클라이언트)은 실제 사용하는 함수 안에서 import
 
+# 이미 처리한 기사 URL 기록 (실행 간 중복 영상 생성 방지, 최근 SEEN_MAX_ENTRIES개 유지)
+SEEN_DB_PATH = os.path.join("data", "crawled", "seen_articles")
+SEEN_MAX_ENTRIES = 512
 
-@dataclass
+# 한 번 실행에서 시나리오로 만들 기사 수
+SCENARIO_ARTICLE_LIMIT = 2
+
+# 시나리오 생성에 사용할 Gemini 모델
+SCENARIO_MODEL = "gemini-2.5-flash"
+
+# Gemini가 반환할 클립 시나리오 배열 스키마
+SCENARIO_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "prompt": {"type": "STRING"},
+            "image_prompt": {"type": "STRING"},
+            "aspect_ratio": {"type": "STRING"},
+        },
+        "required": ["prompt", "image_prompt", "aspect_ratio"],
+    },
+}
+
+
+@dataclass(slots=True, frozen=True)
 class NewsArticle:
     """뉴스 기사 데이터 클래스"""
 
@@ -37,6 +57,49 @@ class NewsArticle:
     time_ago: str
 
 
+def _url_key(url: str) -> str:
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+
+def _dedupe_articles(raw_results: List[dict]) -> List[dict]:
+    """
+    여러 티커에서 중복 수집된 기사와 이전 실행에서 이미 업로드한 기사를 제거
+    (중복 기사 하나당 Gemini/Veo 호출이 통째로 낭비되므로 프롬프트 생성 전에 거름)
+    """
+    os.makedirs(os.path.dirname(SEEN_DB_PATH), exist_ok=True)
+
+    unique = []
+    seen_titles = set()
+    with shelve.open(SEEN_DB_PATH) as seen:
+        for r in raw_results:
+            title_key = r["title"][:40].lower()
+            duplicate = _url_key(r["url"]) in seen or title_key in seen_titles
+            seen_titles.add(title_key)
+            if duplicate:
+                print(f"⏭️ 중복 기사 제외: {r['title']}")
+                continue
+            unique.append(r)
+
+    return unique
+
+
+def mark_seen(urls: Iterable[str]) -> None:
+    """
+    영상으로 만들어 업로드까지 끝난 기사 URL을 기록 (다음 실행에서 제외)
+    오래된 기록은 SEEN_MAX_ENTRIES개만 남기고 정리
+    """
+    os.makedirs(os.path.dirname(SEEN_DB_PATH), exist_ok=True)
+
+    now = time.time()
+    with shelve.open(SEEN_DB_PATH) as seen:
+        for url in urls:
+            seen[_url_key(url)] = now
+        if len(seen) > SEEN_MAX_ENTRIES:
+            oldest = sorted(seen.items(), key=lambda kv: kv[1])
+            for key, _ in oldest[: len(seen) - SEEN_MAX_ENTRIES]:
+                del seen[key]
+
+
 def crawl_data(tickers: List[dict] = None, limit: int = 3) -> List[NewsArticle]:
     """
     Yahoo Finance 뉴스 크롤링
@@ -55,21 +118,13 @@ def crawl_data(tickers: List[dict] = None, limit: int = 3) -> List[NewsArticle]:
             {"name": "NVDA", "count": limit},
         ]
 
+    from src.crawler import yahoo_crawl_all
+
     # 크롤링 실행
-    raw_results = yahoo_crawl_all(tickers)
-
-    # dict -> NewsArticle 변환
-    articles = [
-        NewsArticle(
-            ticker=r["ticker"],
-            title=r["title"],
-            body=r["body"],
-            url=r["url"],
-            images=r["images"],
-            time_ago=r["time_ago"],
-        )
-        for r in raw_results
-    ]
+    raw_results = _dedupe_articles(yahoo_crawl_all(tickers))
+
+    # dict -> NewsArticle 변환 (크롤러 dict 키가 필드명과 동일)
+    articles = [NewsArticle(**r) for r in raw_results]
 
     return articles
 
@@ -83,6 +138,81 @@ def crawl_data(tickers: List[dict] = None, limit: int = 3) -> List[NewsArticle]:
 
 #     return total_scenario, individual_scenarios_list
 
+def _iter_clip_tasks(articles: Iterable[NewsArticle]) -> Iterator[dict]:
+    """기사 하나당 클립 시나리오 하나를 순서대로 생성"""
+    for article in articles:
+        # 기사 제목이나 내용을 바탕으로 프롬프트 구성
+        # 팁: Veo는 구체적인 시각적 묘사가 있을 때 결과가 더 좋습니다.
+        visual_prompt = f"Cinematic digital art of {article.ticker} stock symbol glowing on a high-tech screen, 4k, professional financial news style."
+
+        yield {
+            "prompt": visual_prompt,
+            "gen_image_first": True,       # Imagen으로 첫 프레임 생성 후 영상 제작 (안정적임)
+            "image_prompt": visual_prompt, # 이미지 생성에 사용될 프롬프트
+            "aspect_ratio": "9:16"         # 쇼츠용 세로 비율
+        }
+
+
+def _require_api_key() -> str:
+    """Gemini/Veo API 키 확인 (없으면 API 호출 전에 즉시 실패)"""
+    api_key = os.getenv("GOOGLE_API_KEYLJE")
+    if not api_key:
+        raise ValueError("❌ GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
+    return api_key
+
+
+def get_gemini_client():
+    """Gemini 클라이언트를 한 번만 생성해 재사용 (VeoGenerator와 같은 클라이언트/연결 풀 공유)"""
+    from src.video_generator.video_generator import get_genai_client
+
+    return get_genai_client(os.getenv("GOOGLE_API_KEYLJE"))
+
+
+def _request_clip_tasks(articles: List[NewsArticle]) -> List[dict]:
+    """
+    모든 기사를 한 번의 Gemini 호출로 보내 기사별 클립 시나리오 배열을 받아옴
+    (기사마다 호출하지 않으므로 왕복 지연이 1회로 줄어듦)
+    """
+    from google.genai import types
+
+    client = get_gemini_client()
+
+    payload = [
+        {"ticker": a.ticker, "title": a.title, "body": a.body[:1500]}
+        for a in articles
+    ]
+    contents = (
+        f"For each of the following {len(articles)} articles, output a JSON array "
+        "of objects with keys prompt, image_prompt, aspect_ratio, in the same order. "
+        "prompt/image_prompt must be concrete visual descriptions for a vertical "
+        "financial news short, and aspect_ratio must be \"9:16\".\n\nARTICLES:\n"
+        + json.dumps(payload, ensure_ascii=False)
+    )
+
+    response = client.models.generate_content(
+        model=SCENARIO_MODEL,
+        contents=contents,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=SCENARIO_SCHEMA,
+        ),
+    )
+
+    scenes = json.loads(response.text)
+    if len(scenes) != len(articles):
+        raise ValueError(f"시나리오 개수 불일치: 기사 {len(articles)}개, 응답 {len(scenes)}개")
+
+    return [
+        {
+            "prompt": scene["prompt"],
+            "gen_image_first": True,
+            "image_prompt": scene.get("image_prompt") or scene["prompt"],
+            "aspect_ratio": scene.get("aspect_ratio") or "9:16",
+        }
+        for scene in scenes
+    ]
+
+
 def generate_video_prompt(crawled_data: List[NewsArticle]) -> tuple:
     """
     테스트를 위한 임시 시나리오 생성 함수.
@@ -94,24 +224,16 @@ def generate_video_prompt(crawled_data: List[NewsArticle]) -> tuple:
     total_scenario = "최신 금융 뉴스 요약 쇼츠"
 
     # 2. 개별 영상 클립 시나리오 (VeoGenerator.run_batch에서 사용될 형식)
-    # 기사 데이터를 기반으로 2~3개의 클립만 테스트용으로 생성
+    # 예시로 최대 SCENARIO_ARTICLE_LIMIT개의 기사만 사용하여 테스트
+    test_articles = crawled_data[:SCENARIO_ARTICLE_LIMIT] if crawled_data else []
     individual_scenarios_list = []
-    
-    # 예시로 최대 2개의 기사만 사용하여 테스트
-    test_articles = crawled_data[:2] if crawled_data else []
-
-    for i, article in enumerate(test_articles):
-        # 기사 제목이나 내용을 바탕으로 프롬프트 구성
-        # 팁: Veo는 구체적인 시각적 묘사가 있을 때 결과가 더 좋습니다.
-        visual_prompt = f"Cinematic digital art of {article.ticker} stock symbol glowing on a high-tech screen, 4k, professional financial news style."
-        
-        clip_task = {
-            "prompt": visual_prompt,
-            "gen_image_first": True,       # Imagen으로 첫 프레임 생성 후 영상 제작 (안정적임)
-            "image_prompt": visual_prompt, # 이미지 생성에 사용될 프롬프트
-            "aspect_ratio": "9:16"         # 쇼츠용 세로 비율
-        }
-        individual_scenarios_list.append(clip_task)
+    if test_articles:
+        try:
+            individual_scenarios_list = _request_clip_tasks(test_articles)
+        except Exception as e:
+            # LLM 호출 실패 시 고정 템플릿 시나리오로 대체
+            print(f"⚠️ Gemini 시나리오 생성 실패, 기본 템플릿 사용: {e}")
+            individual_scenarios_list = list(_iter_clip_tasks(test_articles))
 
     # 기사가 없을 경우를 대비한 기본 더미 데이터
     if not individual_scenarios_list:
@@ -139,24 +261,43 @@ def generate_video(total_scenario: str, individual_scenarios_list: List[dict[str
     Returns:
         str: 최종 생성된 영상 파일 경로
     """
+    from src.video_generator.video_generator import VeoGenerator
+    from src.video_generator.editor import AutoEditor
+
     print("\n=== [Video Generation Start] ===")
     
     # 1. 설정 정의
-    API_KEY = os.getenv("GOOGLE_API_KEYLJE") # 환경변수에서 키 가져오기
-    if not API_KEY:
-        raise ValueError("❌ GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
+    API_KEY = _require_api_key() # 환경변수에서 키 가져오기
         
     TEMP_CLIPS_FOLDER = "temp_shorts_clips"
     FINAL_OUTPUT_PATH = "final_shorts_output.mp4"
 
     # 2. VeoGenerator 초기화 및 일괄 생성
     try:
-        generator = VeoGenerator(api_key=API_KEY, model_name="veo-3.1-generate-preview")
+        # VEO_CACHE_DIR을 지정한 경우에만 같은 프롬프트의 클립을 재사용
+        generator = VeoGenerator(
+            api_key=API_KEY,
+            model_name="veo-3.1-generate-preview",
+            cache_dir=os.getenv("VEO_CACHE_DIR") or None,
+        )
         
         # individual_scenarios_list가 VeoGenerator가 요구하는 tasks 형식과 일치한다고 가정
-        # (즉, [{'prompt': '...'}, ... ] 형태)
-        print(f"총 {len(individual_scenarios_list)}개의 클립 생성을 시작합니다.")
-        generator.run_batch(individual_scenarios_list, output_folder=TEMP_CLIPS_FOLDER)
+        # (즉, [{'prompt': '...'}, ... ] 형태). 프롬프트가 빈 시나리오는 API 호출 전에 제외
+        batch_tasks = [
+            {**s, "prompt": p}
+            for s in individual_scenarios_list
+            if (p := s.get("prompt") or s.get("description", ""))
+        ]
+        skipped = len(individual_scenarios_list) - len(batch_tasks)
+        if skipped:
+            print(f"⚠️ 프롬프트가 없는 시나리오 {skipped}개 제외")
+
+        print(f"총 {len(batch_tasks)}개의 클립 생성을 시작합니다.")
+        generator.run_batch(
+            batch_tasks,
+            output_folder=TEMP_CLIPS_FOLDER,
+            max_concurrent=int(os.getenv("VEO_CONCURRENCY", "2")),
+        )
         
     except Exception as e:
         print(f"❌ 영상 생성 중 오류 발생: {e}")
@@ -170,8 +311,8 @@ def generate_video(total_scenario: str, individual_scenarios_list: List[dict[str
         
         # 메서드 체이닝으로 로드 -> 병합 -> 내보내기 수행
         (editor.load_from_folder(TEMP_CLIPS_FOLDER)
-               .concatenate()
-               # 필요하다면 여기에 BGM, 자막 추가 로직 구현
+               .concatenate(method="demuxer")
+               # 필요하다면 여기에 BGM, 자막 추가 로직 구현 (이 경우 concatenate() 사용)
                # .add_bgm("background_music.mp3", volume=0.2)
                .export(FINAL_OUTPUT_PATH))
                
@@ -186,115 +327,14 @@ def generate_video(total_scenario: str, individual_scenarios_list: List[dict[str
         raise e
 
 
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-
-# YouTube API 인증 범위
-YT_SCOPES = ["https://www.googleapis.com/auth/youtube.upload"] #강산 구현
-
-
-def youtube_authenticate():
-    """
-    YouTube API 인증 및 서비스 객체 반환
-    """
-    creds = None
-
-    # 기존 토큰 파일이 있는지 확인
-    if os.path.exists("token_youtube.json"):
-        creds = Credentials.from_authorized_user_file("token_youtube.json", YT_SCOPES)
-
-    # 토큰이 없거나 만료된 경우 새로 인증
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            print("  🔄 YouTube 토큰 갱신 중...")
-            creds.refresh(Request())
-        else:
-            print("  🔐 YouTube 인증 시작...")
-            flow = InstalledAppFlow.from_client_secrets_file("credentials_youtube.json", YT_SCOPES)
-            creds = flow.run_local_server(port=8080)
-
-        # 토큰 저장
-        with open("token_youtube.json", "w") as token:
-            token.write(creds.to_json())
-        print("  ✅ YouTube 토큰 저장 완료!")
-
-    return build("youtube", "v3", credentials=creds)
-
-
-def upload_video_to_youtube(video_path, title, description, tags=None, privacy="unlisted"):
-    """
-    YouTube에 영상 업로드
-
-    Returns:
-        dict: {'success': bool, 'video_id': str, 'url': str, ...}
-    """
-    try:
-        youtube = youtube_authenticate()
-
-        print(f"  업로드 중: {video_path}")
-
-        request = youtube.videos().insert(
-            part="snippet,status",
-            body={
-                "snippet": {
-                    "title": title,
-                    "description": description,
-                    "tags": tags if tags else [],
-                    "categoryId": "22"
-                },
-                "status": {
-                    "privacyStatus": privacy,
-                    "selfDeclaredMadeForKids": False
-                }
-            },
-            media_body=MediaFileUpload(video_path, chunksize=-1, resumable=True)
-        )
-
-        response = request.execute()
-
-        video_id = response.get("id")
-        video_url = f"https://youtu.be/{video_id}" if video_id else None
-
-        print(f"  YouTube 업로드 완료! URL: {video_url}")
-
-        return {"success": True, "video_id": video_id, "url": video_url, "response": response}
-
-    except Exception as e:
-        print(f"  YouTube 업로드 실패: {e}")
-        return {"success": False, "error": str(e)}
-
-
-def upload_multiple_videos(video_list):
-    """
-    여러 영상을 YouTube에 일괄 업로드
-    video_list: [{'video_path':..., 'title':..., 'description':..., 'tags':..., 'privacy':...}, ...]
-    """
-    results = []
-    for i, video_info in enumerate(video_list, 1):
-        print(f"\n[{i}/{len(video_list)}] 영상 업로드 시작")
-        res = upload_video_to_youtube(
-            video_path=video_info.get("video_path"),
-            title=video_info.get("title", "Untitled Video"),
-            description=video_info.get("description", ""),
-            tags=video_info.get("tags", []),
-            privacy=video_info.get("privacy", "unlisted"),
-        )
-        results.append(res)
-
-    success_count = sum(1 for r in results if r.get("success"))
-    print(f"\n📊 업로드 완료: 성공 {success_count}/{len(video_list)}")
-    return results
-
-
 def upload_to_youtube(main_video: str) -> bool:
     """유튜브 업로드"""
     # 남은 작업
     # - 영상 제목 title
     # - description
     # - tags
+    from src.uploader import upload_video_to_youtube
+
     try:
 
         # title =
@@ -318,18 +358,32 @@ def upload_to_youtube(main_video: str) -> bool:
 
 def main():
 
+    # 키가 없으면 몇 분 걸리는 크롤링을 하기 전에 바로 종료
+    _require_api_key()
+
     # 1. 기사 크롤링
     crawled_data = crawl_data()
 
     # 2. 크롤링한 기사 바탕으로 주제 선정 및 전체 영상/개별 영상 시나리오 생성
-    total_scenario, individual_scenarios_list = generate_video_prompt(crawled_data)
+    used_articles = crawled_data[:SCENARIO_ARTICLE_LIMIT]
+    total_scenario, individual_scenarios_list = generate_video_prompt(used_articles)
 
     # 3. 각 시나리오별 영상 생성 (영상 이어 붙이기)
     main_video = generate_video(total_scenario, individual_scenarios_list)
 
-    # 4. 업로드
-    upload_to_youtube(main_video)
+    # 4. 업로드 (성공한 경우에만 사용한 기사를 처리 완료로 기록)
+    if upload_to_youtube(main_video):
+        mark_seen(article.url for article in used_articles)
 
 
 if __name__ == "__main__":
-    main()
+    # 콘솔 UTF-8/로깅 설정은 직접 실행할 때만 (라이브러리 import 시에는 건드리지 않음)
+    from src.crawler import configure_console, configure_logging
+
+    configure_console()
+    log_listener = configure_logging()
+    try:
+        main()
+    finally:
+        # 큐에 남은 로그까지 출력한 뒤 리스너 스레드 종료
+        log_listener.stop()
@@ -1,3 +1,15 @@
-from .yahoo_finance_crawler import YahooFinanceCrawler, crawl_all as yahoo_crawl_all
+from .yahoo_finance_crawler import (
+    YahooFinanceCrawler,
+    configure_console,
+    configure_logging,
+    crawl_all as yahoo_crawl_all,
+    crawl_all_async as yahoo_crawl_all_async,
+)
 
-__all__ = ["YahooFinanceCrawler", "yahoo_crawl_all"]
+__all__ = [
+    "YahooFinanceCrawler",
+    "configure_console",
+    "configure_logging",
+    "yahoo_crawl_all",
+    "yahoo_crawl_all_async",
+]
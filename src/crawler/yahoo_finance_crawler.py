@@ -9,56 +9,108 @@ import subprocess
 import sys
 import platform
 import os
-import io
+import json
+import sqlite3
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 
-# Windows 콘솔 UTF-8 설정
-if platform.system() == "Windows":
-    try:
-        subprocess.run("chcp 65001", shell=True, capture_output=True, check=True)
-    except:
-        pass
-
-os.environ["PYTHONIOENCODING"] = "utf-8"
-os.environ["PYTHONLEGACYWINDOWSSTDIO"] = "utf-8"
-
-try:
-    if hasattr(sys.stdout, "buffer"):
-        sys.stdout = io.TextIOWrapper(
-            sys.stdout.buffer, encoding="utf-8", errors="replace", line_buffering=True
-        )
-    if hasattr(sys.stderr, "buffer"):
-        sys.stderr = io.TextIOWrapper(
-            sys.stderr.buffer, encoding="utf-8", errors="replace", line_buffering=True
-        )
-except:
-    pass
-
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+from selectolax.lexbor import LexborHTMLParser
+import asyncio
+import queue
 import time
 import random
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import re
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
 
-# 로깅 설정
-logging.getLogger().handlers.clear()
+try:
+    from playwright_stealth import stealth_async
+except ImportError:
+    stealth_async = None
+
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+_log_listener = None
+_console_configured = False
+
+
+def configure_logging():
+    """루트 로거를 큐 핸들러로 설정 (실제 출력은 백그라운드 리스너 스레드에서 처리)
+
+    실행 진입점에서 호출하고, 반환된 리스너는 종료 시 finally에서 stop()으로 정리
+    import 시점에는 실행하지 않음 - 라이브러리로 불러온 쪽의 로깅 설정을 건드리지 않기 위함
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return _log_listener
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    )
+
+    log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+
+    _log_listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _log_listener.start()
+    return _log_listener
+
+
+def configure_console():
+    """콘솔 출력을 UTF-8로 설정 (실행 진입점에서 한 번만 호출, 여러 번 호출해도 무방)
+
+    import 시점에는 실행하지 않음 - 라이브러리로 불러온 쪽의 stdout을 건드리지 않기 위함
+    """
+    global _console_configured
+    if _console_configured:
+        return
+    _console_configured = True
+
+    # Windows 콘솔 코드 페이지를 UTF-8로 변경
+    if platform.system() == "Windows":
+        try:
+            subprocess.run("chcp 65001", shell=True, capture_output=True, check=True)
+        except Exception:
+            pass
+
+    # 하위 프로세스용
+    os.environ["PYTHONIOENCODING"] = "utf-8"
+    os.environ["PYTHONLEGACYWINDOWSSTDIO"] = "utf-8"
+
+    # 스트림 객체를 교체하지 않고 인코딩만 변경 (로깅 핸들러가 잡고 있는 stdout 유지)
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.reconfigure(encoding="utf-8", errors="replace", line_buffering=True)
+        except (AttributeError, ValueError):
+            pass
+
 
 # 설정
-MAX_RETRIES = 5
-MIN_DELAY = 2
-MAX_DELAY = 4
-BASE_URL = "https://finance.yahoo.com/quote/"
+MAX_RETRIES = 2
+MAX_REQUESTS_PER_SEC = 2  # 페이지 요청 평균 속도 상한 (전체 티커 합산)
+MAX_CONCURRENT_TICKERS = 3
+MAX_CONCURRENT_DOWNLOADS = 8
+IMAGE_CHUNK_SIZE = 64 * 1024  # 이미지 스트리밍 저장 단위
+PAGE_POOL_SIZE = 5  # 동시에 로드할 페이지 수 (전체 티커 공유)
+NAVIGATION_TIMEOUT_MS = 20000  # 목록 페이지 로드 제한 (컨텍스트 기본값)
+ARTICLE_TIMEOUT_MS = 15000  # 기사 페이지 로드 제한
+ACTION_TIMEOUT_MS = 10000  # 클릭/조회 등 기타 동작 기본 제한
+MIN_BODY_LENGTH = 100  # 이보다 짧은 텍스트는 본문이 아닌 것으로 보고 다음 후보 확인
+# 스크래핑 결과에 영향 없는 리소스는 브라우저에서 받지 않음 (<img src>는 HTML에 그대로 남음)
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+YAHOO_ORIGIN = "https://finance.yahoo.com"
+BASE_URL = f"{YAHOO_ORIGIN}/quote/"
+NEWS_SEARCH_URL = "https://query1.finance.yahoo.com/v1/finance/search"
 
 # Lambda 환경 감지
 IS_LAMBDA = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
@@ -66,53 +118,187 @@ TEMP_DIR = "/tmp" if IS_LAMBDA else "temp_images"
 
 if not IS_LAMBDA:
     Path(TEMP_DIR).mkdir(exist_ok=True)
-    logger.info(f"임시 이미지 저장 경로: {os.path.abspath(TEMP_DIR)}")
+    logger.info("임시 이미지 저장 경로: %s", os.path.abspath(TEMP_DIR))
+
+# 파일명에 쓸 수 없는 문자 패턴
+_SLUG_RE = re.compile(r"[^\w\-]+", re.UNICODE)
+
+# "36m ago" 같은 상대 시간 파싱용
+_TIME_RE = re.compile(r"(\d+)\s*([mhd])")
+_TIME_AGO_RE = re.compile(r"(\d+)\s*([mhd])\s*ago")
+_TIME_UNIT_MINUTES = {"m": 1, "h": 60, "d": 60 * 24}  # 단위별 분 환산
+_INF = float("inf")
+
+# 기사 이미지에서 제외할 아이콘/로고/프로필 이미지 URL 패턴
+_JUNK_IMG_RE = re.compile(r"icon|logo|avatar", re.IGNORECASE)
+
+# 기사 제목 셀렉터 (앞쪽일수록 우선)
+_TITLE_SELECTORS = (
+    ".cover-headline h1.cover-title",  # Yahoo Finance 메인 제목
+    "h1.cover-title",
+    'h1[data-testid="article-title"]',
+    "header h1",
+    "article h1",
+    "h1",
+)
+
+# 기사 이미지 셀렉터 (한 번의 탐색으로 문서 순서대로 수집)
+_IMAGE_SELECTOR = ", ".join(
+    (
+        'img[data-testid="lead-image"]',
+        "article img",
+        ".caas-img-container img",
+        ".caas-body img",
+    )
+)
+
+
+@lru_cache(maxsize=256)
+def _slug(text, max_len=64):
+    """경로 구분자/특수문자를 '_'로 바꿔 파일명으로 안전한 문자열 생성"""
+    return _SLUG_RE.sub("_", text).strip("_")[:max_len]
+
+
+# 기사 캐시 경로
+CACHE_PATH = os.path.join(TEMP_DIR if IS_LAMBDA else "data/crawled", "article_cache.sqlite")
+
+
+def _block_text(node):
+    """노드 텍스트를 줄 단위로 정리 (빈 줄 제거, 앞뒤 공백 제거)"""
+    lines = (line.strip() for line in node.text(separator="\n").split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _image_key(image_url):
+    """리사이즈/쿼리 파라미터만 다른 같은 원본 이미지는 같은 키로 취급"""
+    parsed = urlparse(image_url)
+    path = parsed.path
+    # Yahoo 이미지 프록시(.../res/.../https://media.zenfs.com/...)는 원본 URL 기준
+    idx = path.find("/http")
+    if idx >= 0 and path[idx + 1 :].startswith(("https:/", "http:/")):
+        return path[idx + 1 :]
+    return parsed.netloc + path
+
+
+class RateLimiter:
+    """토큰 버킷 방식 요청 속도 제한 (설정한 속도를 넘을 때만 대기)"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ArticleCache:
+    """URL 기준 기사 캐시 (같은 기사를 다시 크롤링하지 않도록 SQLite에 저장)"""
+
+    def __init__(self, path=CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                body TEXT,
+                images_json TEXT,
+                fetched_at INTEGER
+            )
+        """
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        """캐시된 기사 반환 (없거나 이미지 파일이 사라졌으면 None)"""
+        row = self.conn.execute(
+            "SELECT title, body, images_json FROM cache WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        images = json.loads(row[2])
+        if not all(os.path.exists(img["filepath"]) for img in images):
+            return None
+
+        return {"title": row[0], "body": row[1], "images": images}
+
+    def put(self, url, title, body, images):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+            (url, title, body, json.dumps(images, ensure_ascii=False), int(time.time())),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
 
 
 class YahooFinanceCrawler:
-    def __init__(self):
+    def __init__(self, use_cache=True):
         self.playwright = None
         self.browser = None
         self.context = None
+        self.cache = ArticleCache() if use_cache else None
+        self._image_index = {}  # 이미지 키 -> 저장 경로 (실행 중 기사 간 중복 다운로드 방지)
+        self.failed_urls = []  # 모든 재시도에 실패한 URL (재시도 대기 없이 기록만)
+        self._download_sem = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        # 페이지 풀 크기만큼은 한꺼번에 요청 가능, 장기 평균은 MAX_REQUESTS_PER_SEC 유지
+        self.limiter = RateLimiter(MAX_REQUESTS_PER_SEC, burst=PAGE_POOL_SIZE)
+        self._page_pool = asyncio.Queue()
+
+        # 이미지 다운로드용 세션 (호스트별 연결 풀 재사용으로 매번 TLS 핸드셰이크 방지)
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=MAX_CONCURRENT_DOWNLOADS,
+            # 일시적 CDN 오류는 같은 연결 풀에서 짧게 재시도
+            max_retries=Retry(
+                total=2, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]
+            ),
+        )
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        self.http.headers.update(
+            {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+                "Referer": "https://finance.yahoo.com/",
+            }
+        )
 
     def parse_time_ago(self, time_str):
         """시간 문자열을 분 단위로 변환 (예: '41m ago' → 41, '2h ago' → 120, '1d ago' → 1440)"""
-        try:
-            # 숫자와 단위 추출
-            match = re.search(r"(\d+)\s*([mhd])", time_str.lower())
-            if not match:
-                return float("inf")  # 파싱 실패시 가장 오래된 것으로 처리
-
-            value = int(match.group(1))
-            unit = match.group(2)
-
-            if unit == "m":  # minutes
-                return value
-            elif unit == "h":  # hours
-                return value * 60
-            elif unit == "d":  # days
-                return value * 60 * 24
-            else:
-                return float("inf")
-        except Exception as e:
-            logger.debug(f"시간 파싱 오류: {time_str} - {e}")
-            return float("inf")
+        match = _TIME_RE.search(time_str)
+        # 파싱 실패시 가장 오래된 것으로 처리
+        return _TIME_UNIT_MINUTES[match.group(2)] * int(match.group(1)) if match else _INF
 
-    def __enter__(self):
+    async def __aenter__(self):
         # Stealth 모듈 체크
-        try:
-            from playwright_stealth import stealth_sync
-
-            self.use_stealth = True
+        self.use_stealth = stealth_async is not None
+        if self.use_stealth:
             logger.info("✓ playwright-stealth 로드 성공")
-        except ImportError:
-            self.use_stealth = False
+        else:
             logger.warning("⚠ playwright-stealth 없음. 기본 우회만 사용")
 
-        self.playwright = sync_playwright().start()
+        self.playwright = await async_playwright().start()
 
         # 브라우저 실행
-        self.browser = self.playwright.chromium.launch(
+        self.browser = await self.playwright.chromium.launch(
             headless=False,  # 디버깅용 (배포시 True로 변경)
             args=[
                 "--disable-blink-features=AutomationControlled",
@@ -125,7 +311,7 @@ class YahooFinanceCrawler:
         )
 
         # 브라우저 컨텍스트 설정
-        self.context = self.browser.new_context(
+        self.context = await self.browser.new_context(
             viewport={"width": 1920, "height": 1080},
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
             locale="en-US",
@@ -142,17 +328,8 @@ class YahooFinanceCrawler:
             },
         )
 
-        # Stealth 모드 적용
-        if self.use_stealth:
-            from playwright_stealth import stealth_sync
-
-            page = self.context.new_page()
-            stealth_sync(page)
-            page.close()
-            logger.info("✓ Stealth 모드 활성화")
-
         # 봇 감지 우회 스크립트
-        self.context.add_init_script(
+        await self.context.add_init_script(
             """
             Object.defineProperty(navigator, 'webdriver', {
                 get: () => undefined
@@ -182,18 +359,43 @@ class YahooFinanceCrawler:
         """
         )
 
+        # 이미지/폰트/미디어/스타일시트 요청 차단
+        await self.context.route("**/*", self._route_request)
+
+        # 느린 페이지가 전체 크롤링을 붙잡지 않도록 짧은 기본 타임아웃
+        self.context.set_default_navigation_timeout(NAVIGATION_TIMEOUT_MS)
+        self.context.set_default_timeout(ACTION_TIMEOUT_MS)
+
+        # 티커 간 재사용할 페이지 미리 생성 (init script 적용 이후, stealth는 페이지별 적용)
+        for _ in range(PAGE_POOL_SIZE):
+            page = await self.context.new_page()
+            if self.use_stealth:
+                await stealth_async(page)
+            self._page_pool.put_nowait(page)
+        if self.use_stealth:
+            logger.info("✓ Stealth 모드 활성화")
+
         logger.info("✓ 브라우저 초기화 완료")
         return self
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.cache:
+            self.cache.close()
+        self.http.close()
         if self.context:
-            self.context.close()
+            await self.context.close()
         if self.browser:
-            self.browser.close()
+            await self.browser.close()
         if self.playwright:
-            self.playwright.stop()
+            await self.playwright.stop()
+
+    async def _route_request(self, route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
 
-    def close_popup_if_exists(self, page):
+    async def close_popup_if_exists(self, page):
         """Yahoo Finance 팝업/배너 닫기"""
         try:
             # 쿠키 동의 배너
@@ -205,15 +407,16 @@ class YahooFinanceCrawler:
                 'button:has-text("Accept")',
             ]
 
-            for selector in cookie_selectors:
-                try:
-                    if page.locator(selector).count() > 0:
-                        page.click(selector, timeout=3000)
-                        logger.info("✓ 쿠키 동의 클릭")
-                        time.sleep(1)
-                        return True
-                except:
-                    continue
+            # 셀렉터 목록을 하나로 합쳐 브라우저 왕복을 한 번으로 줄임
+            try:
+                cookie_button = page.locator(", ".join(cookie_selectors)).first
+                if await cookie_button.count() > 0:
+                    await cookie_button.click(timeout=3000)
+                    logger.info("✓ 쿠키 동의 클릭")
+                    await asyncio.sleep(1)
+                    return True
+            except:
+                pass
 
             # 일반 모달 닫기
             close_selectors = [
@@ -224,180 +427,193 @@ class YahooFinanceCrawler:
                 "button.close",
             ]
 
-            for selector in close_selectors:
-                try:
-                    if page.locator(selector).count() > 0:
-                        page.click(selector, timeout=2000)
-                        logger.info("✓ 모달 닫기 클릭")
-                        time.sleep(1)
-                        return True
-                except:
-                    continue
+            try:
+                close_button = page.locator(", ".join(close_selectors)).first
+                if await close_button.count() > 0:
+                    await close_button.click(timeout=2000)
+                    logger.info("✓ 모달 닫기 클릭")
+                    await asyncio.sleep(1)
+                    return True
+            except:
+                pass
 
             # ESC 키
             try:
-                page.keyboard.press("Escape")
-                time.sleep(0.5)
+                await page.keyboard.press("Escape")
+                await asyncio.sleep(0.5)
             except:
                 pass
 
             return False
 
         except Exception as e:
-            logger.debug(f"팝업 처리 오류: {e}")
+            logger.debug("팝업 처리 오류: %s", e)
             return False
 
-    def simulate_human_behavior(self, page):
+    async def simulate_human_behavior(self, page):
         """사람처럼 행동 시뮬레이션"""
         try:
-            time.sleep(random.uniform(1.5, 3))
+            await asyncio.sleep(random.uniform(1.5, 3))
 
             # 마우스 이동
-            page.mouse.move(random.randint(100, 500), random.randint(100, 500))
-            time.sleep(random.uniform(0.3, 0.8))
+            await page.mouse.move(random.randint(100, 500), random.randint(100, 500))
+            await asyncio.sleep(random.uniform(0.3, 0.8))
 
             # 스크롤 (뉴스 더 로드하기 위해)
             for _ in range(random.randint(2, 4)):
                 scroll_amount = random.randint(300, 600)
-                page.evaluate(f"window.scrollBy(0, {scroll_amount})")
-                time.sleep(random.uniform(0.5, 1.2))
+                await page.evaluate(f"window.scrollBy(0, {scroll_amount})")
+                await asyncio.sleep(random.uniform(0.5, 1.2))
 
             # 맨 위로
-            page.evaluate("window.scrollTo(0, 0)")
-            time.sleep(random.uniform(0.5, 1.0))
+            await page.evaluate("window.scrollTo(0, 0)")
+            await asyncio.sleep(random.uniform(0.5, 1.0))
 
         except Exception as e:
-            logger.debug(f"행동 시뮬레이션 오류: {e}")
+            logger.debug("행동 시뮬레이션 오류: %s", e)
 
     def download_image(self, image_url, article_url, ticker, image_index=1):
         """이미지 다운로드"""
         try:
             # 파일명 생성
             parsed = urlparse(article_url)
-            article_id = parsed.path.split("/")[-1][:30] or f"article_{image_index}"
+            article_id = _slug(parsed.path.split("/")[-1], 30) or f"article_{image_index}"
 
             ext = image_url.split(".")[-1].split("?")[0]
             if ext not in ["jpg", "jpeg", "png", "gif", "webp"]:
                 ext = "jpg"
 
-            filename = f"{ticker}_{article_id}_{image_index}.{ext}"
+            filename = f"{_slug(ticker)}_{article_id}_{image_index}.{ext}"
             filepath = os.path.join(TEMP_DIR, filename)
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Referer": "https://finance.yahoo.com/",
-            }
-
-            response = requests.get(image_url, headers=headers, timeout=10)
-            if response.status_code == 200:
+            # 다른 기사에서 이미 받은 같은 이미지면 재사용
+            key = _image_key(image_url)
+            existing = self._image_index.get(key)
+            if existing and os.path.exists(existing):
+                logger.info("♻️ 이미지 재사용: %s", os.path.basename(existing))
+                return existing
+
+            # 이미지 전체를 메모리에 올리지 않고 조각 단위로 파일에 기록 (Lambda /tmp·메모리 보호)
+            with self.http.get(image_url, timeout=10, stream=True) as response:
+                if response.status_code != 200:
+                    return None
                 with open(filepath, "wb") as f:
-                    f.write(response.content)
-                logger.info(f"✓ 이미지 저장: {filename}")
-                return filepath
-            return None
+                    for chunk in response.iter_content(IMAGE_CHUNK_SIZE):
+                        f.write(chunk)
+            self._image_index[key] = filepath
+            logger.info("✓ 이미지 저장: %s", filename)
+            return filepath
 
         except Exception as e:
-            logger.error(f"이미지 다운로드 오류: {e}")
+            logger.error("이미지 다운로드 오류: %s", e)
             return None
 
-    def extract_images(self, soup, article_url, ticker):
-        """기사 이미지 추출"""
+    async def download_images(self, candidates, article_url, ticker):
+        """추출한 이미지 후보를 동시 다운로드 (순서 유지)"""
         images = []
-        image_counter = 1
-        seen_urls = set()
-
-        # 메인 이미지
-        main_selectors = [
-            'img[data-testid="lead-image"]',
-            "article img",
-            ".caas-img-container img",
-            ".caas-body img",
-        ]
-
-        for selector in main_selectors:
-            for img in soup.select(selector):
-                image_url = img.get("src") or img.get("data-src")
-                if not image_url or image_url in seen_urls:
-                    continue
-
-                # 작은 아이콘 제외
-                if "icon" in image_url.lower() or "logo" in image_url.lower():
-                    continue
-                if "avatar" in image_url.lower():
-                    continue
 
-                seen_urls.add(image_url)
+        async def download(image_url, image_index):
+            async with self._download_sem:
+                return await asyncio.to_thread(
+                    self.download_image, image_url, article_url, ticker, image_index
+                )
 
-                if image_url.startswith("//"):
-                    image_url = "https:" + image_url
-                elif not image_url.startswith("http"):
-                    image_url = urljoin("https://finance.yahoo.com", image_url)
+        filepaths = await asyncio.gather(
+            *(
+                download(image_url, idx)
+                for idx, (image_url, _) in enumerate(candidates, start=1)
+            )
+        )
 
-                filepath = self.download_image(
-                    image_url, article_url, ticker, image_counter
+        for (image_url, alt), filepath in zip(candidates, filepaths):
+            if filepath:
+                images.append(
+                    {
+                        "url": image_url,
+                        "filepath": filepath,
+                        "alt": alt,
+                        "type": "main" if not images else "content",
+                    }
                 )
-                if filepath:
-                    images.append(
-                        {
-                            "url": image_url,
-                            "filepath": filepath,
-                            "alt": img.get("alt", ""),
-                            "type": "main" if image_counter == 1 else "content",
-                        }
-                    )
-                    image_counter += 1
 
         return images
 
-    def fetch_url(self, page, url):
-        """URL 가져오기"""
+    async def fetch_article(self, url):
+        """페이지 풀에서 페이지를 빌려 기사 페이지 가져오기"""
+        page = await self._page_pool.get()
+        try:
+            return await self.fetch_url(page, url, simulate=False)
+        finally:
+            self._page_pool.put_nowait(page)
+
+    async def fetch_url(self, page, url, simulate=True, marker=None):
+        """
+        URL 가져오기
+
+        simulate=False면 사람 행동 시뮬레이션을 생략하고 짧은 대기/타임아웃 사용
+        (스크롤이 필요한 뉴스 목록 페이지만 시뮬레이션)
+        marker가 주어지면 HTML에 해당 문자열이 없을 때(봇 차단/동의 페이지 등) 재시도
+        """
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                logger.info(f"📄 [{attempt}/{MAX_RETRIES}] 로딩: {url}")
+                logger.info("📄 [%s/%s] 로딩: %s", attempt, MAX_RETRIES, url)
 
                 if attempt > 1:
-                    wait_time = random.uniform(5, 10) * attempt
-                    logger.info(f"⏳ {wait_time:.1f}초 대기...")
-                    time.sleep(wait_time)
-
-                # 페이지 로드
-                response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                    wait_time = min(3 * (attempt - 1), 6)
+                    logger.info("⏳ %.1f초 대기...", wait_time)
+                    await asyncio.sleep(wait_time)
+
+                # 페이지 로드 (요청 속도를 넘을 때만 대기)
+                await self.limiter.acquire()
+                response = await page.goto(
+                    url,
+                    wait_until="domcontentloaded",
+                    timeout=NAVIGATION_TIMEOUT_MS if simulate else ARTICLE_TIMEOUT_MS,
+                )
 
                 if response:
-                    logger.info(f"상태 코드: {response.status}")
+                    logger.info("상태 코드: %s", response.status)
 
                 # 로딩 대기
-                time.sleep(random.uniform(3, 5))
+                if simulate:
+                    await asyncio.sleep(random.uniform(3, 5))
+                else:
+                    await asyncio.sleep(random.uniform(0.5, 1.0))
 
                 # 팝업 처리
-                self.close_popup_if_exists(page)
+                await self.close_popup_if_exists(page)
 
                 # 사람처럼 행동
-                self.simulate_human_behavior(page)
+                if simulate:
+                    await self.simulate_human_behavior(page)
 
-                html = page.content()
+                html = await page.content()
 
                 # 검증
                 if len(html) < 3000:
-                    logger.warning(f"⚠ HTML 너무 짧음: {len(html)} bytes")
-                    time.sleep(5 * attempt)
+                    logger.warning("⚠ HTML 너무 짧음: %s bytes", len(html))
+                    continue
+                if marker and marker not in html:
+                    logger.warning("⚠ 예상 마커 없음(%s): 차단/동의 페이지 가능성", marker)
                     continue
 
-                logger.info(f"✓ 성공 ({len(html):,} bytes)")
+                logger.info("✓ 성공 (%s bytes)", format(len(html), ","))
                 return html
 
             except PlaywrightTimeout:
-                logger.error(f"⏱ 타임아웃 ({attempt}/{MAX_RETRIES})")
-                time.sleep(10 * attempt)
+                logger.error("⏱ 타임아웃 (%s/%s)", attempt, MAX_RETRIES)
             except Exception as e:
-                logger.error(f"❌ 오류 ({attempt}/{MAX_RETRIES}): {e}")
-                time.sleep(8 * attempt)
+                logger.error("❌ 오류 (%s/%s): %s", attempt, MAX_RETRIES, e)
 
-        logger.error(f"❌ 모든 시도 실패: {url}")
+        logger.error("❌ 모든 시도 실패: %s", url)
+        self.failed_urls.append(url)
         return None
 
-    def extract_article_body(self, soup):
+    def extract_article_body(self, tree):
         """기사 본문 추출"""
+        # 스크립트/스타일은 문서 전체에서 한 번만 제거
+        tree.strip_tags(["script", "style"])
+
         # Yahoo Finance 기사 본문 셀렉터
         body_selectors = [
             ".caas-body",
@@ -407,59 +623,100 @@ class YahooFinanceCrawler:
         ]
 
         for selector in body_selectors:
-            body_elem = soup.select_one(selector)
+            body_elem = tree.css_first(selector)
             if body_elem:
-                # 스크립트/스타일 제거
-                for tag in body_elem(["script", "style", "aside", "nav"]):
+                # 사이드바/내비게이션 제거
+                for tag in body_elem.css("aside, nav"):
                     tag.decompose()
-                text = body_elem.get_text(separator="\n", strip=True)
-                if len(text) > 100:
+                text = _block_text(body_elem)
+                if len(text) > MIN_BODY_LENGTH:
                     return text
 
-        # fallback: 가장 긴 텍스트 블록 찾기
-        candidates = soup.find_all(["article", "main", "div"])
+        # fallback 1: article/main 태그 하나만 확인 (빈 카드/요약만 있으면 fallback 2로)
+        parent = tree.css_first("article") or tree.css_first("main")
+        if parent:
+            text = _block_text(parent)
+            if len(text) > MIN_BODY_LENGTH:
+                return text
+
+        # fallback 2: body 바로 아래 div 중 가장 긴 텍스트 블록 (중첩 div 중복 탐색 방지)
         max_text = ""
-        for c in candidates:
-            for tag in c(["script", "style"]):
-                tag.decompose()
-            text = c.get_text(separator="\n", strip=True)
+        for c in tree.css("body > div"):
+            text = _block_text(c)
             if len(text) > len(max_text):
                 max_text = text
         return max_text
 
-    def extract_news_links(self, soup, ticker, max_articles=10):
+    def extract_image_candidates(self, tree):
+        """기사 이미지 후보 (URL, alt) 추출 - 모든 셀렉터를 한 번의 탐색으로 처리"""
+        candidates = []
+        seen_urls = set()
+
+        for img in tree.css(_IMAGE_SELECTOR):
+            image_url = img.attributes.get("src") or img.attributes.get("data-src")
+            if not image_url or image_url in seen_urls:
+                continue
+
+            # 작은 아이콘 제외
+            if _JUNK_IMG_RE.search(image_url):
+                continue
+
+            seen_urls.add(image_url)
+
+            if image_url.startswith("//"):
+                image_url = "https:" + image_url
+            elif not image_url.startswith("http"):
+                image_url = urljoin("https://finance.yahoo.com", image_url)
+
+            candidates.append((image_url, img.attributes.get("alt") or ""))
+
+        return candidates
+
+    def extract_article(self, tree, default_title):
+        """파싱된 기사 트리 하나에서 제목, 본문, 이미지 후보를 함께 추출"""
+        # 제목 (Yahoo Finance cover-headline 우선)
+        title = default_title
+        for selector in _TITLE_SELECTORS:
+            title_tag = tree.css_first(selector)
+            if title_tag:
+                title = title_tag.text(strip=True)
+                break
+
+        # 본문 (사이드바/내비게이션 제거 후의 트리에서 이미지 후보 추출)
+        body = self.extract_article_body(tree)
+        return title, body, self.extract_image_candidates(tree)
+
+    def extract_news_links(self, tree, ticker, max_articles=10):
         """뉴스 목록에서 기사 링크 추출 (최신순 정렬)"""
         news_links = []
         seen_urls = set()
 
         # 기사 컨테이너 찾기: li.stream-item.story-item
-        article_containers = soup.select("li.stream-item.story-item")
-        logger.info(f"🔍 기사 컨테이너 {len(article_containers)}개 발견")
+        article_containers = tree.css("li.stream-item.story-item")
+        logger.info("🔍 기사 컨테이너 %s개 발견", len(article_containers))
 
         for container in article_containers:
             # 링크 찾기 (titles 클래스가 있는 a 태그)
-            a_tag = container.select_one('a.titles, a[class*="titles"]')
+            a_tag = container.css_first('a.titles, a[class*="titles"]')
             if not a_tag:
                 continue
 
-            href = a_tag.get("href", "")
+            href = a_tag.attributes.get("href") or ""
 
             # 제목 찾기 (h3.clamp)
-            h3_tag = a_tag.select_one("h3.clamp")
-            title = (
-                h3_tag.get_text(strip=True) if h3_tag else a_tag.get_text(strip=True)
-            )
+            h3_tag = a_tag.css_first("h3.clamp")
+            title = h3_tag.text(strip=True) if h3_tag else a_tag.text(strip=True)
 
             if not href or not title:
                 continue
 
-            # 전체 URL 생성
-            if href.startswith("/"):
-                full_url = f"https://finance.yahoo.com{href}"
-            elif not href.startswith("http"):
-                full_url = urljoin("https://finance.yahoo.com", href)
-            else:
+            # 전체 URL 생성 (대부분 "/"로 시작하므로 urljoin은 예외적인 경우만)
+            if href.startswith("http"):
                 full_url = href
+            elif href[0] == "/":
+                full_url = YAHOO_ORIGIN + href
+            else:
+                full_url = urljoin(YAHOO_ORIGIN + "/", href)
 
             # 중복 체크
             if full_url in seen_urls:
@@ -473,20 +730,20 @@ class YahooFinanceCrawler:
 
             # 시간 정보 추출 (.publishing)
             time_str = ""
-            time_minutes = float("inf")
+            time_minutes = _INF
 
-            time_elem = container.select_one('.publishing, div[class*="publishing"]')
+            time_elem = container.css_first('.publishing, div[class*="publishing"]')
             if time_elem:
-                time_text = time_elem.get_text(strip=True)
+                time_text = time_elem.text(strip=True)
                 # "Reuters Videos • 36m ago" 에서 시간 부분만 추출
-                time_match = re.search(r"(\d+)\s*([mhd])\s*ago", time_text.lower())
+                time_match = _TIME_AGO_RE.search(time_text.lower())
                 if time_match:
                     time_str = f"{time_match.group(1)}{time_match.group(2)} ago"
                     time_minutes = self.parse_time_ago(time_str)
 
             # 시간 정보 없으면 제외
             if not time_str:
-                logger.debug(f"시간 정보 없음, 제외: {title[:40]}...")
+                logger.debug("시간 정보 없음, 제외: %s...", title[:40])
                 continue
 
             seen_urls.add(full_url)
@@ -507,130 +764,203 @@ class YahooFinanceCrawler:
 
         # 로그 출력
         for idx, news in enumerate(news_links, start=1):
-            logger.info(f"[{idx:2d}] 📝 {news['title']}")
-            logger.info(f"      🔗 {news['url']}")
-            logger.info(f"      ⏰ {news['time_str']}")
+            logger.info("[%2d] 📝 %s", idx, news["title"])
+            logger.info("      🔗 %s", news["url"])
+            logger.info("      ⏰ %s", news["time_str"])
 
-        logger.info(f"\n📰 최신순 정렬 후 상위 {len(news_links)}개 기사 링크 추출")
+        logger.info("\n📰 최신순 정렬 후 상위 %s개 기사 링크 추출", len(news_links))
         return news_links
 
-    def crawl_company(self, ticker, count):
+    def fetch_news_json(self, ticker, max_articles=10):
+        """
+        Yahoo 검색 JSON API로 뉴스 목록 조회 (브라우저 렌더링 없이)
+
+        Returns:
+            extract_news_links와 같은 형식의 리스트. 실패/결과 없음이면 None
+        """
+        try:
+            response = self.http.get(
+                NEWS_SEARCH_URL,
+                params={"q": ticker, "newsCount": 20, "quotesCount": 0},
+                timeout=10,
+            )
+            if response.status_code != 200:
+                logger.warning("⚠ 뉴스 JSON 응답 코드: %s", response.status_code)
+                return None
+            items = response.json().get("news", [])
+        except Exception as e:
+            logger.warning("⚠ 뉴스 JSON 조회 오류: %s", e)
+            return None
+
+        now = time.time()
+        news_links = []
+        seen_urls = set()
+        for item in items:
+            title = (item.get("title") or "").strip()
+            url = item.get("link") or ""
+            published = item.get("providerPublishTime")
+            if not title or not url or not published or url in seen_urls:
+                continue
+            if "/video/" in url:
+                continue
+
+            # 기존 목록 형식("36m ago")에 맞춰 상대 시간으로 변환
+            minutes = max(int((now - published) // 60), 0)
+            if minutes < 60:
+                time_str = f"{minutes}m ago"
+            elif minutes < 60 * 24:
+                time_str = f"{minutes // 60}h ago"
+            else:
+                time_str = f"{minutes // (60 * 24)}d ago"
+
+            seen_urls.add(url)
+            news_links.append(
+                {
+                    "title": title,
+                    "url": url,
+                    "time_str": time_str,
+                    "time_minutes": self.parse_time_ago(time_str),
+                }
+            )
+
+        if not news_links:
+            return None
+
+        news_links.sort(key=lambda x: x["time_minutes"])
+        news_links = news_links[:max_articles]
+        logger.info("📰 뉴스 JSON에서 %s개 기사 링크 추출", len(news_links))
+        return news_links
+
+    async def crawl_company(self, ticker, count):
         """회사(티커) 뉴스 수집"""
         results = []
         seen_titles = set()
 
         news_page_url = f"{BASE_URL}{ticker}/news/"
-        logger.info(f"\n{'='*70}")
-        logger.info(f"🔍 {ticker} 크롤링 시작")
-        logger.info(f"🔗 {news_page_url}")
-        logger.info(f"{'='*70}\n")
-
-        page = self.context.new_page()
-
-        try:
-            # 뉴스 목록 페이지 가져오기
-            html = self.fetch_url(page, news_page_url)
+        logger.info("\n%s", "=" * 70)
+        logger.info("🔍 %s 크롤링 시작", ticker)
+        logger.info("🔗 %s", news_page_url)
+        logger.info("%s\n", "=" * 70)
+
+        # 뉴스 목록: JSON API 우선, 실패하면 브라우저로 목록 페이지 렌더링
+        news_links = await asyncio.to_thread(self.fetch_news_json, ticker, 10)
+        if news_links is None:
+            page = await self._page_pool.get()
+            try:
+                html = await self.fetch_url(page, news_page_url, marker="stream-item")
+            finally:
+                self._page_pool.put_nowait(page)
             if html is None:
                 return results
 
-            soup = BeautifulSoup(html, "lxml")
+            tree = LexborHTMLParser(html)
 
             # 기사 링크 추출
-            news_links = self.extract_news_links(soup, ticker, max_articles=10)
-
-            logger.info("=" * 70)
-
-            if not news_links:
-                logger.warning(f"⚠ 기사 링크를 찾지 못함. HTML 구조 확인 필요")
-                # 디버깅용 HTML 저장
-                debug_path = os.path.join(TEMP_DIR, f"{ticker}_debug.html")
-                with open(debug_path, "w", encoding="utf-8") as f:
-                    f.write(html)
-                logger.info(f"디버깅용 HTML 저장: {debug_path}")
-                return results
-
-            # 각 기사 크롤링
-            for idx, news_item in enumerate(news_links[:count], start=1):
-                article_url = news_item["url"]
+            news_links = self.extract_news_links(tree, ticker, max_articles=10)
+
+        logger.info("=" * 70)
+
+        if not news_links:
+            logger.warning("⚠ 기사 링크를 찾지 못함. HTML 구조 확인 필요")
+            # 디버깅용 HTML 저장
+            debug_path = os.path.join(TEMP_DIR, f"{ticker}_debug.html")
+            with open(debug_path, "w", encoding="utf-8") as f:
+                f.write(html)
+            logger.info("디버깅용 HTML 저장: %s", debug_path)
+            return results
+
+        # 기사 페이지 동시 로드 (이전 실행에서 수집한 기사는 페이지 요청 생략)
+        items = news_links[:count]
+        cached_items = [
+            self.cache.get(item["url"]) if self.cache else None for item in items
+        ]
+        to_fetch = [i for i, cached in enumerate(cached_items) if not cached]
+        fetched = await asyncio.gather(
+            *(self.fetch_article(items[i]["url"]) for i in to_fetch)
+        )
+        article_htmls = dict(zip(to_fetch, fetched))
 
-                logger.info(f"\n{'='*70}")
-                logger.info(f"📄 기사 [{idx}/{count}] 크롤링 중...")
-                logger.info(f"🔗 {article_url}")
-                logger.info(f"{'='*70}")
+        # 각 기사 처리 (목록 순서대로 중복 제목 제거)
+        for idx, news_item in enumerate(items, start=1):
+            article_url = news_item["url"]
 
-                # 기사 페이지 가져오기
-                article_html = self.fetch_url(page, article_url)
-                if article_html is None:
-                    logger.error(f"❌ 기사 [{idx}] 가져오기 실패")
-                    continue
+            logger.info("\n%s", "=" * 70)
+            logger.info("📄 기사 [%s/%s] 처리 중...", idx, count)
+            logger.info("🔗 %s", article_url)
+            logger.info("%s", "=" * 70)
 
-                article_soup = BeautifulSoup(article_html, "lxml")
-
-                # 제목 추출 (Yahoo Finance cover-headline 우선)
-                title_selectors = [
-                    ".cover-headline h1.cover-title",  # Yahoo Finance 메인 제목
-                    "h1.cover-title",
-                    'h1[data-testid="article-title"]',
-                    "header h1",
-                    "article h1",
-                    "h1",
-                ]
-
-                title = news_item["title"]
-                for selector in title_selectors:
-                    title_tag = article_soup.select_one(selector)
-                    if title_tag:
-                        title = title_tag.get_text(strip=True)
-                        break
-
-                # 중복 제목 체크
-                if title in seen_titles:
-                    logger.warning(f"⚠ 중복 제목: {title}")
+            cached = cached_items[idx - 1]
+            if cached:
+                if cached["title"] in seen_titles:
+                    logger.warning("⚠ 중복 제목: %s", cached["title"])
                     continue
-                seen_titles.add(title)
-
-                # 본문 추출
-                body = self.extract_article_body(article_soup)
-
-                # 이미지 추출
-                images = self.extract_images(article_soup, article_url, ticker)
-
-                logger.info(f"✅ 기사 수집 완료!")
-                logger.info(f"   📌 제목: {title}")
-                logger.info(f"   🔗 링크: {article_url}")
-                logger.info(f"   ⏰ 게시: {news_item.get('time_str', '시간 없음')}")
-                logger.info(
-                    f"   📝 본문 미리보기: {body[:100].replace(chr(10), ' ')}..."
-                )
-                logger.info(f"   📝 본문 길이: {len(body):,}자")
-                logger.info(f"   🖼️  이미지: {len(images)}개")
+                seen_titles.add(cached["title"])
 
+                logger.info("♻️ 캐시 사용: %s", cached["title"])
                 results.append(
                     {
                         "ticker": ticker,
-                        "title": title,
-                        "body": body,
+                        "title": cached["title"],
+                        "body": cached["body"],
                         "url": article_url,
-                        "images": images,
+                        "images": cached["images"],
                         "time_ago": news_item.get("time_str", ""),
                     }
                 )
+                continue
+
+            article_html = article_htmls[idx - 1]
+            if article_html is None:
+                logger.error("❌ 기사 [%s] 가져오기 실패", idx)
+                continue
 
-                # 요청 간 딜레이
-                time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
+            article_tree = LexborHTMLParser(article_html)
 
-        finally:
-            page.close()
+            title, body, candidates = self.extract_article(
+                article_tree, news_item["title"]
+            )
+
+            # 중복 제목 체크
+            if title in seen_titles:
+                logger.warning("⚠ 중복 제목: %s", title)
+                continue
+            seen_titles.add(title)
+
+            # 이미지 다운로드 (파서 밖에서 스레드로 실행)
+            images = await self.download_images(candidates, article_url, ticker)
+
+            logger.info("✅ 기사 수집 완료!")
+            logger.info("   📌 제목: %s", title)
+            logger.info("   🔗 링크: %s", article_url)
+            logger.info("   ⏰ 게시: %s", news_item.get("time_str", "시간 없음"))
+            logger.info(
+                "   📝 본문 미리보기: %s...", body[:100].replace(chr(10), " ")
+            )
+            logger.info("   📝 본문 길이: %s자", format(len(body), ","))
+            logger.info("   🖼️  이미지: %s개", len(images))
+
+            results.append(
+                {
+                    "ticker": ticker,
+                    "title": title,
+                    "body": body,
+                    "url": article_url,
+                    "images": images,
+                    "time_ago": news_item.get("time_str", ""),
+                }
+            )
+            if self.cache:
+                self.cache.put(article_url, title, body, images)
 
-        logger.info(f"\n{'='*70}")
-        logger.info(f"✅ {ticker} 크롤링 완료: 총 {len(results)}개 기사")
-        logger.info(f"{'='*70}\n")
+        logger.info("\n%s", "=" * 70)
+        logger.info("✅ %s 크롤링 완료: 총 %s개 기사", ticker, len(results))
+        logger.info("%s\n", "=" * 70)
 
         return results
 
 
-def crawl_all(company_list):
-    """전체 크롤링 실행"""
+async def crawl_all_async(company_list, max_concurrent=MAX_CONCURRENT_TICKERS):
+    """전체 크롤링 실행 (티커별 동시 실행, 브라우저 컨텍스트 공유)"""
     # 입력 형식 표준화
     standardized_list = []
     for item in company_list:
@@ -640,12 +970,33 @@ def crawl_all(company_list):
             standardized_list.append({"name": item[0], "count": item[1]})
 
     all_results = []
+    sem = asyncio.Semaphore(max_concurrent)
 
-    with YahooFinanceCrawler() as crawler:
-        for comp in standardized_list:
-            ticker = comp["name"]
-            count = comp["count"]
-            comp_results = crawler.crawl_company(ticker, count)
-            all_results.extend(comp_results)
+    async with YahooFinanceCrawler() as crawler:
+
+        async def crawl_one(comp):
+            async with sem:
+                return await crawler.crawl_company(comp["name"], comp["count"])
+
+        results = await asyncio.gather(
+            *(crawl_one(comp) for comp in standardized_list), return_exceptions=True
+        )
+
+    if crawler.failed_urls:
+        logger.warning("⚠ 가져오지 못한 URL %s개:", len(crawler.failed_urls))
+        for url in crawler.failed_urls:
+            logger.warning("   - %s", url)
+
+    # 입력 순서대로 결과 병합
+    for comp, comp_results in zip(standardized_list, results):
+        if isinstance(comp_results, Exception):
+            logger.error("❌ %s 크롤링 실패: %s", comp["name"], comp_results)
+            continue
+        all_results.extend(comp_results)
 
     return all_results
+
+
+def crawl_all(company_list, max_concurrent=MAX_CONCURRENT_TICKERS):
+    """전체 크롤링 실행"""
+    return asyncio.run(crawl_all_async(company_list, max_concurrent))
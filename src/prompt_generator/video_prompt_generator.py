@@ -1,10 +1,38 @@
-from typing import Dict, List, Optional
+from typing import Dict, Final, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import hashlib
 import json
 import logging
+import os
+import tempfile
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+# 템플릿이 바뀌면 올려서 기존 캐시를 무효화
+PROMPT_TEMPLATE_VERSION = "v2"
+# 캐시 키 해시 알고리즘 (바뀌면 기존 캐시는 무시)
+CACHE_KEY_ALGO = "blake2b-v1"
+# 디스크 캐시 최대 항목 수 (초과 시 가장 오래 쓰이지 않은 항목부터 삭제)
+PROMPT_CACHE_MAX_ENTRIES = 500
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """JSON 직렬화 (orjson 우선, UTF-8 bytes 반환)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 
 class CharacterType(Enum):
     ELON_MUSK = "elon_musk"
@@ -13,6 +41,91 @@ class CharacterType(Enum):
     PENGUIN = "penguin"
 
 
+# 캐릭터별 고정 데이터 (호출마다 dict를 새로 만들지 않도록 모듈 상수로 유지)
+_CHARACTER_TEMPLATES: Final[Dict[CharacterType, Dict[str, str]]] = {
+    CharacterType.ELON_MUSK: {
+        "persona": "일론 머스크의 톤과 스타일로 설명하는 혁신적이고 미래지향적인 관점",
+        "visual_style": "미래적이고 기술적인 배경, 스페이스X 로켓이나 테슬라 차량이 있는 환경",
+        "speech_pattern": "혁신, 미래, 기술에 대한 열정적인 언어 사용",
+        "outfit": "검은색 티셔츠 또는 정장, 캐주얼하면서도 전문적인 모습",
+    },
+    CharacterType.JEROME_POWELL: {
+        "persona": "연방준비제도 의장으로서 신중하고 전문적인 경제 분석",
+        "visual_style": "연방준비제도 건물이나 경제 차트가 있는 전문적인 배경",
+        "speech_pattern": "신중하고 분석적인 경제 용어 사용",
+        "outfit": "정장, 넥타이, 전문적이고 권위있는 모습",
+    },
+    CharacterType.JAEHOON: {
+        "persona": "친근하고 이해하기 쉽게 설명하는 금융 전문가",
+        "visual_style": "현대적이고 깔끔한 스튜디오나 사무실 환경",
+        "speech_pattern": "친근하면서도 전문적인 설명, 일반인도 이해할 수 있는 언어",
+        "outfit": "비즈니스 캐주얼, 접근하기 쉬운 모습",
+    },
+    CharacterType.PENGUIN: {
+        "persona": "귀엽고 재미있는 펭귄이 알려주는 금융 뉴스",
+        "visual_style": "남극 빙하나 귀여운 애니메이션 배경",
+        "speech_pattern": "귀엽고 재미있는 표현, 이해하기 쉬운 설명",
+        "outfit": "펭귄 모습, 때로는 작은 액세서리 착용",
+    },
+}
+
+_TITLE_PREFIXES: Final[Dict[CharacterType, str]] = {
+    CharacterType.ELON_MUSK: "🚀 일론 머스크가 알려주는: ",
+    CharacterType.JEROME_POWELL: "📊 제롬 파월이 분석하는: ",
+    CharacterType.JAEHOON: "💡 재훈이가 쉽게 설명하는: ",
+    CharacterType.PENGUIN: "🐧 펭귄이 알려주는 금융뉴스: ",
+}
+
+_GREETINGS: Final[Dict[CharacterType, str]] = {
+    CharacterType.ELON_MUSK: "혁신의 아이콘, 일론 머스크입니다.",
+    CharacterType.JEROME_POWELL: "연방준비제도 의장 제롬 파월입니다.",
+    CharacterType.JAEHOON: "여러분의 금융 가이드, 재훈입니다.",
+    CharacterType.PENGUIN: "귀여운 금융 펭귄입니다! 🐧",
+}
+
+_OUTROS: Final[Dict[CharacterType, str]] = {
+    CharacterType.ELON_MUSK: "미래를 함께 만들어갑시다. 구독과 좋아요 부탁드립니다!",
+    CharacterType.JEROME_POWELL: "경제 분석이 도움이 되었기를 바랍니다. 구독해주세요.",
+    CharacterType.JAEHOON: "도움이 되셨나요? 구독하고 알림 설정해주세요!",
+    CharacterType.PENGUIN: "펭펭! 구독하면 더 많은 금융 뉴스를 알려드려요! 🐧❤️",
+}
+
+_VIDEO_STYLES: Final[Dict[CharacterType, str]] = {
+    CharacterType.ELON_MUSK: "futuristic_tech_style",
+    CharacterType.JEROME_POWELL: "professional_financial_style",
+    CharacterType.JAEHOON: "modern_casual_style",
+    CharacterType.PENGUIN: "cute_animated_style",
+}
+
+# 스크립트/비주얼 설명 고정 틀 (캐릭터별 값만 format으로 채움)
+_SCRIPT_HEAD_TMPL: Final[str] = (
+    "[인트로]\n"
+    "안녕하세요! {greeting}\n"
+    "\n"
+    "오늘은 중요한 금융 뉴스를 가져왔습니다.\n"
+    "\n"
+    "[메인 콘텐츠]\n"
+)
+_SCRIPT_TAIL_TMPL: Final[str] = "\n\n[아웃트로]\n{outro}"
+_VISUAL_TMPL: Final[str] = (
+    "캐릭터: {persona}\n"
+    "복장: {outfit}\n"
+    "배경: {visual_style}\n"
+    "\n"
+    "영상 스타일:\n"
+    "- 16:9 비율의 풀HD 영상\n"
+    "- {style} 스타일의 프레젠테이션\n"
+    "- 부드러운 조명과 전문적인 카메라 앵글\n"
+    "- 뉴스 내용과 관련된 차트나 이미지 삽입\n"
+    "- 60초 길이의 쇼츠 형태\n"
+    "\n"
+    "시각적 요소:\n"
+    "- 인트로: 캐릭터 등장과 인사\n"
+    "- 메인: 뉴스 설명과 분석\n"
+    "- 아웃트로: 마무리 멘트와 구독 유도"
+)
+
+
 @dataclass
 class VideoPrompt:
     character: CharacterType
@@ -25,49 +138,113 @@ class VideoPrompt:
 
 
 class VideoPromptGenerator:
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = None):
         self.character_templates = self._load_character_templates()
+        # 비주얼 설명은 캐릭터에만 의존하므로 한 번만 만들어 두고 재사용
+        # (기사마다 동일한 프리픽스가 유지되어 프롬프트 캐싱에 유리)
+        self._persona_cache: Dict[CharacterType, str] = {
+            character: self._build_visual_description(character)
+            for character in CharacterType
+        }
+        # 스크립트의 인사/마무리 부분도 캐릭터별로 미리 구성
+        self._persona_blocks: Dict[CharacterType, Tuple[str, str]] = {
+            character: self._build_persona_blocks(character)
+            for character in CharacterType
+        }
+        # 같은 기사/캐릭터 조합을 다시 처리할 때 재생성하지 않도록 디스크 캐시 사용
+        self.cache_path = cache_path
+        self._prompt_cache: Dict[str, Dict] = self._load_prompt_cache()
+        self._cache_dirty = False
+
+    def _load_prompt_cache(self) -> Dict[str, Dict]:
+        """디스크에 저장된 프롬프트 캐시 로드"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = _loads(f.read())
+        except (OSError, ValueError) as e:
+            logging.warning(f"Prompt cache load failed ({self.cache_path}): {e}")
+            return {}
+
+        if not isinstance(data, dict) or data.get("algo") != CACHE_KEY_ALGO:
+            logging.info("Prompt cache key format changed, starting fresh")
+            return {}
+        return data.get("entries", {})
+
+    def _save_prompt_cache(self):
+        """임시 파일에 쓴 뒤 교체하여 캐시 파일이 깨지지 않도록 저장"""
+        if not self.cache_path or not self._cache_dirty:
+            return
+        cache_dir = os.path.dirname(self.cache_path) or "."
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_dumps({"algo": CACHE_KEY_ALGO, "entries": self._prompt_cache}))
+            os.replace(tmp_path, self.cache_path)
+            self._cache_dirty = False
+        except OSError:
+            os.remove(tmp_path)
+            raise
+
+    def _cache_key(
+        self, news_data: Dict, character: CharacterType, duration: int
+    ) -> str:
+        raw = "|".join(
+            [
+                news_data.get("url", ""),
+                news_data.get("title", ""),
+                character.value,
+                str(duration),
+                PROMPT_TEMPLATE_VERSION,
+            ]
+        )
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=32).hexdigest()
 
     def _load_character_templates(self) -> Dict[CharacterType, Dict]:
         """캐릭터별 프롬프트 템플릿 로드"""
-        return {
-            CharacterType.ELON_MUSK: {
-                "persona": "일론 머스크의 톤과 스타일로 설명하는 혁신적이고 미래지향적인 관점",
-                "visual_style": "미래적이고 기술적인 배경, 스페이스X 로켓이나 테슬라 차량이 있는 환경",
-                "speech_pattern": "혁신, 미래, 기술에 대한 열정적인 언어 사용",
-                "outfit": "검은색 티셔츠 또는 정장, 캐주얼하면서도 전문적인 모습",
-            },
-            CharacterType.JEROME_POWELL: {
-                "persona": "연방준비제도 의장으로서 신중하고 전문적인 경제 분석",
-                "visual_style": "연방준비제도 건물이나 경제 차트가 있는 전문적인 배경",
-                "speech_pattern": "신중하고 분석적인 경제 용어 사용",
-                "outfit": "정장, 넥타이, 전문적이고 권위있는 모습",
-            },
-            CharacterType.JAEHOON: {
-                "persona": "친근하고 이해하기 쉽게 설명하는 금융 전문가",
-                "visual_style": "현대적이고 깔끔한 스튜디오나 사무실 환경",
-                "speech_pattern": "친근하면서도 전문적인 설명, 일반인도 이해할 수 있는 언어",
-                "outfit": "비즈니스 캐주얼, 접근하기 쉬운 모습",
-            },
-            CharacterType.PENGUIN: {
-                "persona": "귀엽고 재미있는 펭귄이 알려주는 금융 뉴스",
-                "visual_style": "남극 빙하나 귀여운 애니메이션 배경",
-                "speech_pattern": "귀엽고 재미있는 표현, 이해하기 쉬운 설명",
-                "outfit": "펭귄 모습, 때로는 작은 액세서리 착용",
-            },
-        }
+        return _CHARACTER_TEMPLATES
 
     def generate_prompt(
         self, news_data: Dict, character: CharacterType, duration: int = 60
     ) -> VideoPrompt:
         """뉴스 데이터를 바탕으로 영상 생성 프롬프트 생성"""
+        prompt = self._generate_prompt(news_data, character, duration)
+        self._save_prompt_cache()
+        return prompt
+
+    def generate_prompts(
+        self, news_list: List[Dict], character: CharacterType, duration: int = 60
+    ) -> List[VideoPrompt]:
+        """여러 기사의 프롬프트를 생성하고 캐시 파일은 마지막에 한 번만 저장"""
+        try:
+            return [
+                self._generate_prompt(news_data, character, duration)
+                for news_data in news_list
+            ]
+        finally:
+            self._save_prompt_cache()
+
+    def _generate_prompt(
+        self, news_data: Dict, character: CharacterType, duration: int
+    ) -> VideoPrompt:
+        key = None
+        if self.cache_path:
+            key = self._cache_key(news_data, character, duration)
+            cached = self._prompt_cache.pop(key, None)
+            if cached:
+                # 최근 사용 항목을 뒤로 보내 LRU 순서 유지
+                self._prompt_cache[key] = cached
+                logging.info(f"Prompt cache hit: {news_data.get('title', '')}")
+                return self._prompt_from_dict(cached)
 
         title = self._generate_title(news_data, character)
         script = self._generate_script(news_data, character)
         visual_description = self._generate_visual_description(news_data, character)
         style = self._get_video_style(character)
 
-        return VideoPrompt(
+        prompt = VideoPrompt(
             character=character,
             title=title,
             script=script,
@@ -77,82 +254,49 @@ class VideoPromptGenerator:
             created_at=datetime.now().isoformat(),
         )
 
-    def _generate_title(self, news_data: Dict, character: CharacterType) -> str:
-        """영상 제목 생성"""
-        original_title = news_data.get("title", "")
+        if key:
+            self._prompt_cache[key] = self._prompt_to_dict(prompt)
+            # dict는 삽입 순서를 유지하므로 앞쪽이 가장 오래 쓰이지 않은 항목
+            for old_key in list(self._prompt_cache)[:-PROMPT_CACHE_MAX_ENTRIES]:
+                del self._prompt_cache[old_key]
+            self._cache_dirty = True
 
-        title_templates = {
-            CharacterType.ELON_MUSK: f"🚀 일론 머스크가 알려주는: {original_title}",
-            CharacterType.JEROME_POWELL: f"📊 제롬 파월이 분석하는: {original_title}",
-            CharacterType.JAEHOON: f"💡 재훈이가 쉽게 설명하는: {original_title}",
-            CharacterType.PENGUIN: f"🐧 펭귄이 알려주는 금융뉴스: {original_title}",
-        }
+        return prompt
 
-        return title_templates[character]
+    def _generate_title(self, news_data: Dict, character: CharacterType) -> str:
+        """영상 제목 생성"""
+        return _TITLE_PREFIXES[character] + news_data.get("title", "")
 
     def _generate_script(self, news_data: Dict, character: CharacterType) -> str:
         """영상 스크립트 생성"""
         content = news_data.get("content", "")
-        template = self.character_templates[character]
-
-        base_script = f"""
-        [인트로]
-        안녕하세요! {self._get_character_greeting(character)}
-        
-        오늘은 중요한 금융 뉴스를 가져왔습니다.
-        
-        [메인 콘텐츠]
-        {self._format_content_for_character(content, character)}
-        
-        [아웃트로]
-        {self._get_character_outro(character)}
-        """
-
-        return base_script.strip()
+        head, tail = self._persona_blocks[character]
+
+        return head + self._format_content_for_character(content, character) + tail
+
+    def _build_persona_blocks(self, character: CharacterType) -> Tuple[str, str]:
+        """스크립트에서 기사 내용 앞/뒤에 오는 캐릭터별 고정 부분"""
+        head = _SCRIPT_HEAD_TMPL.format(greeting=_GREETINGS[character])
+        tail = _SCRIPT_TAIL_TMPL.format(outro=_OUTROS[character])
+
+        return head, tail
 
     def _generate_visual_description(
         self, news_data: Dict, character: CharacterType
     ) -> str:
         """영상 비주얼 설명 생성"""
-        template = self.character_templates[character]
-
-        visual_prompt = f"""
-        캐릭터: {template['persona']}
-        복장: {template['outfit']}
-        배경: {template['visual_style']}
-        
-        영상 스타일:
-        - 16:9 비율의 풀HD 영상
-        - {character.value} 스타일의 프레젠테이션
-        - 부드러운 조명과 전문적인 카메라 앵글
-        - 뉴스 내용과 관련된 차트나 이미지 삽입
-        - 60초 길이의 쇼츠 형태
-        
-        시각적 요소:
-        - 인트로: 캐릭터 등장과 인사
-        - 메인: 뉴스 설명과 분석
-        - 아웃트로: 마무리 멘트와 구독 유도
-        """
-
-        return visual_prompt.strip()
+        return self._persona_cache[character]
+
+    def _build_visual_description(self, character: CharacterType) -> str:
+        """캐릭터별 비주얼 설명 문자열 구성"""
+        template = _CHARACTER_TEMPLATES[character]
+        return _VISUAL_TMPL.format(style=character.value, **template)
 
     def _get_character_greeting(self, character: CharacterType) -> str:
-        greetings = {
-            CharacterType.ELON_MUSK: "혁신의 아이콘, 일론 머스크입니다.",
-            CharacterType.JEROME_POWELL: "연방준비제도 의장 제롬 파월입니다.",
-            CharacterType.JAEHOON: "여러분의 금융 가이드, 재훈입니다.",
-            CharacterType.PENGUIN: "귀여운 금융 펭귄입니다! 🐧",
-        }
-        return greetings[character]
+        return _GREETINGS[character]
 
     def _get_character_outro(self, character: CharacterType) -> str:
-        outros = {
-            CharacterType.ELON_MUSK: "미래를 함께 만들어갑시다. 구독과 좋아요 부탁드립니다!",
-            CharacterType.JEROME_POWELL: "경제 분석이 도움이 되었기를 바랍니다. 구독해주세요.",
-            CharacterType.JAEHOON: "도움이 되셨나요? 구독하고 알림 설정해주세요!",
-            CharacterType.PENGUIN: "펭펭! 구독하면 더 많은 금융 뉴스를 알려드려요! 🐧❤️",
-        }
-        return outros[character]
+        return _OUTROS[character]
 
     def _format_content_for_character(
         self, content: str, character: CharacterType
@@ -173,17 +317,11 @@ class VideoPromptGenerator:
         return content
 
     def _get_video_style(self, character: CharacterType) -> str:
-        styles = {
-            CharacterType.ELON_MUSK: "futuristic_tech_style",
-            CharacterType.JEROME_POWELL: "professional_financial_style",
-            CharacterType.JAEHOON: "modern_casual_style",
-            CharacterType.PENGUIN: "cute_animated_style",
-        }
-        return styles[character]
+        return _VIDEO_STYLES[character]
 
-    def save_prompt(self, prompt: VideoPrompt, filename: str):
-        """생성된 프롬프트를 파일로 저장"""
-        prompt_data = {
+    @staticmethod
+    def _prompt_to_dict(prompt: VideoPrompt) -> Dict:
+        return {
             "character": prompt.character.value,
             "title": prompt.title,
             "script": prompt.script,
@@ -193,8 +331,16 @@ class VideoPromptGenerator:
             "created_at": prompt.created_at,
         }
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(prompt_data, f, ensure_ascii=False, indent=2)
+    @staticmethod
+    def _prompt_from_dict(data: Dict) -> VideoPrompt:
+        return VideoPrompt(**{**data, "character": CharacterType(data["character"])})
+
+    def save_prompt(self, prompt: VideoPrompt, filename: str):
+        """생성된 프롬프트를 파일로 저장"""
+        prompt_data = self._prompt_to_dict(prompt)
+
+        with open(filename, "wb") as f:
+            f.write(_dumps(prompt_data, indent=True))
 
         logging.info(f"Prompt saved to {filename}")
 
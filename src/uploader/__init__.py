@@ -1,9 +1,10 @@
 # 파일명: src/uploader/__init__.py
 
 # 실제 구현 파일(youtube_upload_for_main)에서 함수를 가져옵니다.
-from .youtube_upload_for_main import upload_video_to_youtube
+from .youtube_upload_for_main import upload_video_to_youtube, upload_multiple_videos
 
 # 외부에서 import 할 수 있는 목록을 정의합니다.
 __all__ = [
     "upload_video_to_youtube",
+    "upload_multiple_videos",
 ]
\ No newline at end of file
@@ -5,51 +5,180 @@ YouTube 업로드 모듈 (Main 통합용)
 """
 
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 import os
+import random
+import threading
+import time
 
 # YouTube API 인증 범위
 YT_SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 
+# 재개 가능 업로드 설정
+# 청크 하나를 보낼 때마다 왕복 1회가 생기므로 처리량 ≈ 청크 크기 / RTT
+# (10 MiB / 300ms ≈ 280 Mbit/s 로 충분), 메모리는 청크 하나 분량만 사용하고 진행률도 청크마다 표시
+# chunksize=-1(한 번에 전송)은 진행률/재개 단위가 사라지므로 사용하지 않음
+DEFAULT_CHUNK_SIZE = 10 * 1024 * 1024  # 10 MiB (256 KiB의 배수여야 함)
+RETRIABLE_STATUS_CODES = {500, 502, 503, 504}
+MAX_RETRIES = 5
 
-def youtube_authenticate():
+# 일괄 업로드 동시 실행 수 기본값 (할당량 보호를 위해 작게 유지, YT_UPLOAD_PAR로 조정 가능)
+MAX_CONCURRENT_UPLOADS = 2
+
+# 동시 업로드 시 토큰 갱신/저장이 겹치지 않도록 인증 구간 보호
+_AUTH_LOCK = threading.Lock()
+
+# 실행 중 재사용할 인증 정보 (만료 5분 전부터 미리 갱신)
+_CREDS = None
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# 스레드별 YouTube 서비스 객체 캐시 (httplib2 연결은 스레드 간 공유 불가)
+_SERVICE_LOCAL = threading.local()
+
+
+def _ensure_credentials():
+    """
+    공유 인증 정보 반환 (없거나 만료 임박이면 _AUTH_LOCK 안에서 갱신/재인증)
+
+    스레드별 서비스 객체가 같은 인증 정보를 쓰므로, AuthorizedHttp가 각자 갱신하기 전에
+    여기서 잠금을 잡고 미리 갱신 (TOKEN_REFRESH_MARGIN이 google-auth 갱신 기준보다 김)
+
+    Returns:
+        Credentials: 유효한 YouTube 인증 정보
+    """
+    global _CREDS
+
+    with _AUTH_LOCK:
+        creds = _CREDS
+
+        # 메모리에 없을 때만 토큰 파일을 읽음
+        if creds is None and os.path.exists("token_youtube.json"):
+            creds = Credentials.from_authorized_user_file(
+                "token_youtube.json", YT_SCOPES
+            )
+
+        # 토큰이 없거나 만료(임박)한 경우 새로 인증
+        # (google-auth의 expiry는 tzinfo 없는 UTC 시각이므로 같은 형태로 비교)
+        expiring = (
+            creds is not None
+            and creds.expiry is not None
+            and creds.expiry - datetime.now(timezone.utc).replace(tzinfo=None)
+            < TOKEN_REFRESH_MARGIN
+        )
+        if not creds or not creds.valid or expiring:
+            if creds and creds.refresh_token:
+                print("  🔄 YouTube 토큰 갱신 중...")
+                creds.refresh(Request())
+            else:
+                print("  🔐 YouTube 인증 시작...")
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    "credentials_youtube.json", YT_SCOPES
+                )
+                creds = flow.run_local_server(port=8080)
+
+            # 토큰이 바뀐 경우에만 저장 (임시 파일에 쓴 뒤 교체)
+            tmp_path = "token_youtube.json.tmp"
+            with open(tmp_path, "w") as token:
+                token.write(creds.to_json())
+            os.replace(tmp_path, "token_youtube.json")
+            print("  ✅ YouTube 토큰 저장 완료!")
+
+        _CREDS = creds
+        return creds
+
+
+def youtube_authenticate(creds=None):
     """
     YouTube API 인증 및 서비스 객체 반환
 
+    Args:
+        creds (optional): 사용할 인증 정보. 없으면 공유 인증 정보를 확인/갱신해서 사용.
+
     Returns:
         youtube service: YouTube API 서비스 객체
     """
-    creds = None
-
-    # 기존 토큰 파일이 있는지 확인
-    if os.path.exists("token_youtube.json"):
-        creds = Credentials.from_authorized_user_file("token_youtube.json", YT_SCOPES)
-
-    # 토큰이 없거나 만료된 경우 새로 인증
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            print("  🔄 YouTube 토큰 갱신 중...")
-            creds.refresh(Request())
-        else:
-            print("  🔐 YouTube 인증 시작...")
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials_youtube.json", YT_SCOPES
-            )
-            creds = flow.run_local_server(port=8080)
+    if creds is None:
+        creds = _ensure_credentials()
+
+    # 패키지에 포함된 discovery 문서를 사용하고 파일 캐시는 끔 (매번 네트워크 조회 방지)
+    return build(
+        "youtube",
+        "v3",
+        credentials=creds,
+        static_discovery=True,
+        cache_discovery=False,
+    )
 
-        # 토큰 저장
-        with open("token_youtube.json", "w") as token:
-            token.write(creds.to_json())
-        print("  ✅ YouTube 토큰 저장 완료!")
 
-    return build("youtube", "v3", credentials=creds)
+def get_youtube_service():
+    """
+    현재 스레드의 YouTube 서비스 객체 반환
+
+    호출마다 토큰 만료 임박 여부를 확인해 갱신하고, 서비스 객체는 재인증으로
+    인증 정보가 바뀐 경우에만 새로 생성
+
+    Returns:
+        youtube service: YouTube API 서비스 객체
+    """
+    creds = _ensure_credentials()
+    youtube = getattr(_SERVICE_LOCAL, "youtube", None)
+    if youtube is None or getattr(_SERVICE_LOCAL, "creds", None) is not creds:
+        youtube = youtube_authenticate(creds)
+        _SERVICE_LOCAL.youtube = youtube
+        _SERVICE_LOCAL.creds = creds
+    return youtube
+
+
+def _resumable_upload(request):
+    """
+    청크 단위로 업로드를 진행하고, 일시적 서버 오류는 지수 백오프로 재시도
+
+    Args:
+        request: videos().insert() 요청 객체
+
+    Returns:
+        dict: 업로드 완료 후 YouTube API 응답
+    """
+    response = None
+    retry = 0
+
+    while response is None:
+        # 긴 업로드 중 토큰이 만료되지 않도록 청크마다 확인
+        # (AuthorizedHttp가 스레드마다 공유 인증 정보를 동시에 갱신하지 않게 잠금 안에서 미리 갱신)
+        if _CREDS is not None:
+            _ensure_credentials()
+        try:
+            status, response = request.next_chunk()
+            retry = 0
+            if status:
+                print(f"  ⏳ 업로드 진행률: {int(status.progress() * 100)}%")
+        except HttpError as e:
+            if e.resp.status not in RETRIABLE_STATUS_CODES or retry >= MAX_RETRIES:
+                raise
+            retry += 1
+            wait = 2**retry + random.random()
+            print(
+                f"  ⚠️ 서버 오류({e.resp.status}), {wait:.1f}초 후 재시도 ({retry}/{MAX_RETRIES})"
+            )
+            time.sleep(wait)
+
+    return response
 
 
 def upload_video_to_youtube(
-    video_path, title, description, tags=None, privacy="unlisted"
+    video_path,
+    title,
+    description,
+    tags=None,
+    privacy="unlisted",
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    youtube=None,
 ):
     """
     YouTube에 영상 업로드
@@ -60,13 +189,16 @@ def upload_video_to_youtube(
         description (str): 영상 설명
         tags (list, optional): 태그 리스트. Defaults to None.
         privacy (str, optional): 공개 범위 (public/unlisted/private). Defaults to "unlisted".
+        chunk_size (int, optional): 업로드 청크 크기(바이트). Defaults to 10 MiB.
+        youtube (optional): 재사용할 YouTube 서비스 객체. 없으면 스레드별 캐시 사용.
 
     Returns:
         dict: YouTube API 응답 (video_id, url 등 포함)
     """
     try:
-        # YouTube 인증
-        youtube = youtube_authenticate()
+        # YouTube 서비스 (스레드별로 한 번만 인증/생성)
+        if youtube is None:
+            youtube = get_youtube_service()
 
         print(f"  📤 업로드 중: {video_path}")
 
@@ -82,11 +214,13 @@ def upload_video_to_youtube(
                 },
                 "status": {"privacyStatus": privacy, "selfDeclaredMadeForKids": False},
             },
-            media_body=MediaFileUpload(video_path, chunksize=-1, resumable=True),
+            media_body=MediaFileUpload(
+                video_path, mimetype="video/*", chunksize=chunk_size, resumable=True
+            ),
         )
 
-        # 업로드 실행
-        response = request.execute()
+        # 업로드 실행 (청크 단위, 실패 시 해당 청크부터 재개)
+        response = _resumable_upload(request)
 
         video_id = response["id"]
         video_url = f"https://youtu.be/{video_id}"
@@ -107,37 +241,54 @@ def upload_video_to_youtube(
         return {"success": False, "error": str(e)}
 
 
-# def upload_multiple_videos(video_list):
-#     """
-#     여러 영상을 YouTube에 일괄 업로드
+def _upload_parallelism():
+    """YT_UPLOAD_PAR 환경변수를 호출 시점에 읽음 (load_dotenv 이후, 잘못된 값이면 기본값)"""
+    raw = os.environ.get("YT_UPLOAD_PAR", "")
+    try:
+        return max(1, int(raw)) if raw.strip() else MAX_CONCURRENT_UPLOADS
+    except ValueError:
+        print(f"  ⚠️ YT_UPLOAD_PAR 값이 올바르지 않습니다 ({raw!r}), 기본값 {MAX_CONCURRENT_UPLOADS} 사용")
+        return MAX_CONCURRENT_UPLOADS
+
+
+def upload_multiple_videos(video_list, max_concurrent=None):
+    """
+    여러 영상을 YouTube에 일괄 업로드 (최대 max_concurrent개 동시 업로드)
 
-#     Args:
-#         video_list (list): 영상 정보가 담긴 딕셔너리 리스트
-#                           각 딕셔너리는 video_path, title, description, tags, privacy 키를 포함
+    Args:
+        video_list (list): 영상 정보가 담긴 딕셔너리 리스트
+                          각 딕셔너리는 video_path, title, description, tags, privacy 키를 포함
+        max_concurrent (int, optional): 동시 업로드 수. Defaults to YT_UPLOAD_PAR 또는 2.
+                          (최소 1)
 
-#     Returns:
-#         list: 각 업로드 결과 리스트
-#     """
-#     results = []
+    Returns:
+        list: 각 업로드 결과 리스트 (입력 순서 유지)
+    """
 
-#     for i, video_info in enumerate(video_list, 1):
-#         print(f"\n[{i}/{len(video_list)}] 영상 업로드 시작")
+    def upload_one(i, video_info):
+        print(f"\n[{i}/{len(video_list)}] 영상 업로드 시작")
+
+        # 업로드는 네트워크 대기 위주라 스레드로 충분
+        # (서비스 객체는 작업 스레드마다 get_youtube_service()로 재사용)
+        return upload_video_to_youtube(
+            video_path=video_info.get("video_path"),
+            title=video_info.get("title", "Untitled Video"),
+            description=video_info.get("description", ""),
+            tags=video_info.get("tags", []),
+            privacy=video_info.get("privacy", "unlisted"),
+        )
 
-#         result = upload_video_to_youtube(
-#             video_path=video_info.get("video_path"),
-#             title=video_info.get("title", "Untitled Video"),
-#             description=video_info.get("description", ""),
-#             tags=video_info.get("tags", []),
-#             privacy=video_info.get("privacy", "unlisted"),
-#         )
+    if max_concurrent is None:
+        max_concurrent = _upload_parallelism()
 
-#         results.append(result)
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as ex:
+        results = list(ex.map(upload_one, range(1, len(video_list) + 1), video_list))
 
-#     # 결과 요약
-#     success_count = sum(1 for r in results if r.get("success"))
-#     print(f"\n📊 업로드 완료: 성공 {success_count}/{len(video_list)}")
+    # 결과 요약
+    success_count = sum(1 for r in results if r.get("success"))
+    print(f"\n📊 업로드 완료: 성공 {success_count}/{len(video_list)}")
 
-#     return results
+    return results
 
 
 # # 테스트용 실행 코드
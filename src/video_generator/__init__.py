@@ -1,7 +1,15 @@
-from .video_generator import VeoGenerator
-from .editor import AutoEditor
-
 __all__ = [
     "VeoGenerator",
     "AutoEditor",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # 패키지 import만으로 MoviePy/Pillow가 로드되지 않도록 클래스를 처음 참조할 때 import
+    if name == "VeoGenerator":
+        from .video_generator import VeoGenerator
+        return VeoGenerator
+    if name == "AutoEditor":
+        from .editor import AutoEditor
+        return AutoEditor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
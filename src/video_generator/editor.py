@@ -1,12 +1,207 @@
 import os
 import re
-from moviepy import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, concatenate_videoclips
+import json
+import shutil
+import subprocess
+import tempfile
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from moviepy import VideoClip, VideoFileClip, AudioClip, AudioFileClip, CompositeVideoClip, concatenate_videoclips
+
+# 정규화 인코딩 설정 (쇼츠 해상도에서 Veo 원본 비트레이트는 과함 → 파일 크기/디스크 I/O 절감)
+NORMALIZE_CRF = 28
+NORMALIZE_MAXRATE = "3.5M"
+NORMALIZE_BUFSIZE = "6M"
+
+# MoviePy 렌더링(자막/BGM 합성) 인코딩 설정 (쇼츠는 medium 프리셋의 미세한 화질 이득이 불필요)
+EXPORT_PRESET = "veryfast"
+EXPORT_CRF = 20
+
+# 하드웨어 H.264 인코더 우선순위와 인코더별 옵션 (사용 불가하면 libx264)
+_HW_ENCODER_PARAMS = {
+    "h264_nvenc": ["-rc", "vbr", "-cq", "23", "-b:v", "6M"],
+    "h264_qsv": ["-global_quality", "23"],
+    "h264_videotoolbox": ["-b:v", "6M"],
+}
+# MoviePy는 -preset을 항상 붙이므로 x264 프리셋 이름 대신 인코더별로 받아들이는 값을 넘김
+# (videotoolbox에는 preset 옵션이 없음 - 테스트 인코딩에서 거부되면 libx264 사용)
+_HW_ENCODER_PRESETS = {
+    "h264_nvenc": "p4",
+    "h264_qsv": "veryfast",
+    "h264_videotoolbox": "medium",
+}
+
+# 파일명의 첫 번째 숫자 묶음 (clip_2.mp4 → 2)
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _natural_key(filename: str):
+    """숫자가 있는 파일명은 숫자 순서로, 없는 파일명은 그 뒤에 이름 순서로 정렬"""
+    m = _DIGITS_RE.search(os.path.splitext(filename)[0])  # 확장자(.mp4)의 숫자는 제외
+    return (0, int(m.group()), filename) if m else (1, 0, filename)
+
+
+def _probe_streams(path: str):
+    """ffprobe로 스트림 정보(코덱/해상도/fps/샘플레이트) 조회. 실패 시 None
+
+    같은 파일명이 실행마다 다시 쓰이므로 수정 시각/크기까지 캐시 키에 포함
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return _probe_streams_cached(path, st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=256)
+def _probe_streams_cached(path: str, mtime_ns: int, size: int):
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error",
+             "-show_entries", "stream=codec_type,codec_name,width,height,r_frame_rate,sample_rate",
+             "-of", "json", path],
+            capture_output=True, text=True, check=True
+        )
+        streams = json.loads(result.stdout).get("streams", [])
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+    return tuple(tuple(sorted(s.items())) for s in streams)
+
+
+@lru_cache(maxsize=None)
+def _load_font(font_path: str, font_size: int):
+    """TTF 폰트는 한 번만 로드해 모든 자막에서 재사용"""
+    return ImageFont.truetype(font_path, font_size)
+
+
+@lru_cache(maxsize=128)
+def _render_subtitle(text: str, font_path: str, font_size: int = 50, color: str = "white"):
+    """자막 텍스트를 투명 배경 RGBA 배열로 한 번만 래스터화 (같은 문구는 재사용)"""
+    font = _load_font(font_path, font_size)
+    measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    left, top, right, bottom = measure.multiline_textbbox((0, 0), text, font=font)
+    img = Image.new("RGBA", (max(right - left, 1), max(bottom - top, 1)), (0, 0, 0, 0))
+    ImageDraw.Draw(img).multiline_text((-left, -top), text, font=font, fill=color)
+    return np.array(img)
+
+
+@lru_cache(maxsize=1)
+def _pick_encoder() -> str:
+    """사용 가능한 H.264 하드웨어 인코더 선택 (프로세스당 한 번만 확인)
+
+    ffmpeg 빌드에 인코더가 포함돼 있어도 GPU/드라이버가 없으면 실패하므로 짧은 테스트 인코딩으로 확인
+    """
+    try:
+        listed = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "libx264"
+    for encoder in _HW_ENCODER_PARAMS:
+        if encoder not in listed:
+            continue
+        try:
+            subprocess.run(
+                ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+                 "-c:v", encoder, "-preset", _HW_ENCODER_PRESETS[encoder], "-f", "null", "-"],
+                capture_output=True, check=True, timeout=15
+            )
+            return encoder
+        except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            continue
+    return "libx264"
+
+
+def _subtitle_track(subs: list, font_path: str, width: int, duration: float):
+    """자막 전체를 하나의 레이어로 합친 클립 (시각 t에 보이는 자막만 찾아서 그림)
+
+    자막 높이만 한 띠 캔버스를 사용하고, 겹치는 자막은 모두 합성 (나중에 시작한 것이 위)
+    """
+    subs = sorted(subs, key=lambda s: s['start'])
+    starts = [s['start'] for s in subs]
+    # 앞쪽 자막들 중 가장 늦은 종료 시각 (역방향 탐색을 일찍 멈추는 기준)
+    max_ends = list(accumulate((s['end'] for s in subs), max))
+    images = [_render_subtitle(s['text'], font_path) for s in subs]
+    height = max(img.shape[0] for img in images)
+    width = max([width] + [img.shape[1] for img in images])
+    blank_rgb = np.zeros((height, width, 3), dtype=np.uint8)
+    blank_alpha = np.zeros((height, width), dtype=float)
+
+    @lru_cache(maxsize=2)
+    def layer(active_ids):
+        # 현재/직전 자막 조합의 캔버스만 유지 (자막 수와 무관한 메모리 사용)
+        rgb = np.zeros((height, width, 3), dtype=float)
+        alpha = blank_alpha.copy()
+        for i in active_ids:
+            img = images[i]
+            h, w = img.shape[:2]
+            x, y = (width - w) // 2, height - h
+            a = img[:, :, 3:4] / 255.0
+            dst_rgb, dst_a = rgb[y:y + h, x:x + w], alpha[y:y + h, x:x + w, None]
+            # 알파 합성 (source-over): 뒤에 그린 자막이 위에 옴
+            out_a = a + dst_a * (1 - a)
+            dst_rgb[:] = np.divide(
+                img[:, :, :3] * a + dst_rgb * dst_a * (1 - a), out_a,
+                out=np.zeros_like(dst_rgb), where=out_a > 0,
+            )
+            dst_a[:] = out_a
+        return rgb.astype(np.uint8), alpha
+
+    def active(t):
+        # 시작 시각 기준 이분 탐색 후, 아직 끝나지 않은 이전 자막까지 거슬러 올라감
+        ids = []
+        i = bisect_right(starts, t) - 1
+        while i >= 0 and max_ends[i] > t:
+            if t < subs[i]['end']:
+                ids.append(i)
+            i -= 1
+        return tuple(reversed(ids))
+
+    def frame(t):
+        ids = active(t)
+        return layer(ids)[0] if ids else blank_rgb
+
+    def mask(t):
+        ids = active(t)
+        return layer(ids)[1] if ids else blank_alpha
+
+    return (VideoClip(frame, duration=duration)
+            .with_mask(VideoClip(mask, is_mask=True, duration=duration)))
+
+
+def _normalize_clip(src: str, dst: str, resolution, has_audio: bool = True):
+    """클립 하나를 목표 해상도/fps/오디오 형식으로 한 번만 재인코딩 (concat 복사용)"""
+    w, h = resolution
+    cmd = ["ffmpeg", "-y", "-v", "error", "-i", src]
+    if not has_audio:
+        # 오디오가 없는 클립은 무음 트랙을 붙여 스트림 구성을 맞춤
+        cmd += ["-f", "lavfi", "-i", "anullsrc=r=48000:cl=stereo", "-shortest"]
+    cmd += [
+        "-map", "0:v:0", "-map", "0:a:0" if has_audio else "1:a:0",
+        "-vf", f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+               f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1",
+        "-r", "30", "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+        "-crf", str(NORMALIZE_CRF), "-maxrate", NORMALIZE_MAXRATE, "-bufsize", NORMALIZE_BUFSIZE,
+        "-c:a", "aac", "-b:a", "96k", "-ar", "48000", "-ac", "2",
+        dst,
+    ]
+    subprocess.run(cmd, check=True)
+
 
 class AutoEditor:
-    def __init__(self, resolution=(1920, 1080)):
+    def __init__(self, resolution=(1920, 1080), keep_source_audio=True):
         self.target_res = resolution
+        self.keep_source_audio = keep_source_audio  # False면 원본 오디오 스트림을 열지 않음 (BGM으로 교체할 때)
         self.clips = []
+        self.clip_paths = []
         self.final_clip = None
+        self._modified = False  # BGM/자막이 추가되면 스트림 복사 불가
+        self._demuxer = False  # concatenate(method="demuxer") 사용 여부
+        self._concat_method = None  # MoviePy 병합 방식 (실제 병합은 합성이 필요할 때까지 미룸)
         print(f"✅ [Editor] 초기화 완료 (Target: {resolution})")
 
     def load_from_folder(self, folder_path: str):
@@ -15,64 +210,195 @@ class AutoEditor:
             print("   ❌ 폴더가 없습니다.")
             return self
 
-        # 파일명 숫자 기준 정렬 (01.mp4 -> 02.mp4)
-        files = [f for f in os.listdir(folder_path) if f.endswith(".mp4")]
-        files.sort(key=lambda f: int(re.sub(r'\D', '', f)) if re.sub(r'\D', '', f).isdigit() else f)
+        # 파일명 숫자 기준 정렬 (01.mp4 -> 02.mp4), 0바이트(중단된 렌더링) 파일은 ffprobe 전에 제외
+        with os.scandir(folder_path) as it:
+            entries = [
+                e for e in it
+                if e.name.endswith(".mp4") and e.is_file() and e.stat().st_size > 0
+            ]
+        entries.sort(key=lambda e: _natural_key(e.name))
 
-        self.clips = []
-        for f in files:
-            path = os.path.join(folder_path, f)
+        # 클립은 MoviePy 합성이 필요할 때만 열고, 여기서는 경로만 기록 (ffmpeg 프로세스/파이프 절약)
+        self.close()
+        self.clip_paths = []
+        can_probe = shutil.which("ffprobe") is not None
+        for e in entries:
+            f, path = e.name, e.path
+            if can_probe and not any(dict(s).get("codec_type") == "video" for s in (_probe_streams(path) or ())):
+                print(f"   ⚠️ 로드 실패 ({f}): 영상 스트림 없음")
+                continue
+            self.clip_paths.append(path)
+            print(f"   - 로드: {f}")
+        return self
+
+    def _open_clips(self):
+        """MoviePy 경로에서만 클립 열기 (크기 조정은 export에서 ffmpeg scale 필터로 처리)"""
+        if self.clips:
+            return self.clips
+        for path in self.clip_paths:
             try:
-                # MoviePy 2.0 문법: resized()
-                clip = VideoFileClip(path).resized(self.target_res)
-                self.clips.append(clip)
-                print(f"   - 로드: {f}")
+                # 마스크는 쓰지 않으므로 열지 않음
+                self.clips.append(VideoFileClip(path, audio=self.keep_source_audio, has_mask=False))
             except Exception as e:
-                print(f"   ⚠️ 로드 실패 ({f}): {e}")
+                print(f"   ⚠️ 로드 실패 ({os.path.basename(path)}): {e}")
+        return self.clips
+
+    def close(self):
+        """열려 있는 클립(ffmpeg 리더 프로세스) 정리"""
+        if self.final_clip is not None:
+            self.final_clip.close()
+            self.final_clip = None
+        for clip in self.clips:
+            clip.close()
+        self.clips = []
         return self
 
-    def concatenate(self):
-        if self.clips:
-            self.final_clip = concatenate_videoclips(self.clips, method="compose")
-            print(f"🎞️ 병합 완료 (길이: {self.final_clip.duration:.2f}초)")
+    def concatenate(self, method="chain"):
+        # demuxer: MoviePy 합성 없이 export에서 ffmpeg concat demuxer로 병합 (BGM/자막 불가)
+        if method == "demuxer":
+            self._demuxer = True
+            print(f"🎞️ 병합 예약 (ffmpeg concat demuxer, 클립 {len(self.clip_paths)}개)")
+            return self
+        # 클립은 BGM/자막 합성이나 MoviePy 렌더링이 필요할 때 _build_final_clip에서 연다
+        self._concat_method = method
+        print(f"🎞️ 병합 예약 (클립 {len(self.clip_paths)}개)")
         return self
 
+    def _build_final_clip(self):
+        """예약된 병합을 실제로 수행 (MoviePy 경로에서만 클립을 엶)"""
+        if self.final_clip is None and self._concat_method and self._open_clips():
+            method = self._concat_method
+            # chain: 프레임을 그대로 이어 붙임 (합성 없음) - 모든 클립 크기가 같을 때만 사용
+            if method == "chain" and any(tuple(c.size) != tuple(self.clips[0].size) for c in self.clips):
+                method = "compose"
+            self.final_clip = concatenate_videoclips(self.clips, method=method)
+            print(f"🎞️ 병합 완료 (길이: {self.final_clip.duration:.2f}초)")
+        return self.final_clip
+
     def add_bgm(self, music_path: str, volume=0.3):
-        if self.final_clip and os.path.exists(music_path):
+        if os.path.exists(music_path) and self._build_final_clip():
             print(f"🎵 BGM 추가: {music_path}")
-            audio = AudioFileClip(music_path)
-            
-            # 루프 및 길이 조절 (MoviePy 2.0 호환)
-            if audio.duration < self.final_clip.duration:
-                from moviepy import concatenate_audioclips
-                loops = int(self.final_clip.duration // audio.duration) + 1
-                audio = concatenate_audioclips([audio] * loops)
-            
-            audio = audio.subclipped(0, self.final_clip.duration).with_volume_scaled(volume)
+            base = AudioFileClip(music_path)
+
+            # 영상보다 짧으면 시간축을 감아서 반복 재생 (클립을 복제해 이어 붙이지 않음)
+            if base.duration < self.final_clip.duration:
+                audio = AudioClip(
+                    lambda t: base.get_frame(np.asarray(t) % base.duration),
+                    duration=self.final_clip.duration,
+                    fps=base.fps,
+                )
+            else:
+                audio = base.subclipped(0, self.final_clip.duration)
+
+            audio = audio.with_volume_scaled(volume)
             self.final_clip = self.final_clip.with_audio(audio)
+            self._modified = True
         return self
 
     def add_subtitles(self, subs: list, font="C:/Windows/Fonts/malgun.ttf"):
-        if not self.final_clip or not subs:
+        if not subs or not self._build_final_clip():
             return self
         
         print("📝 자막 합성 중...")
-        txt_clips = []
-        for s in subs:
-            # MoviePy 2.0 메서드 체이닝
-            txt = (TextClip(text=s['text'], font=font, font_size=50, color='white', method='label')
-                   .with_position(('center', 'bottom'))
-                   .with_start(s['start'])
-                   .with_duration(s['end'] - s['start']))
-            txt_clips.append(txt)
-            
-        self.final_clip = CompositeVideoClip([self.final_clip] + txt_clips)
+        # 자막별 클립 N개 대신 자막 레이어 하나만 합성 (프레임마다 보이는 자막 하나만 처리)
+        track = _subtitle_track(subs, font, self.final_clip.w, self.final_clip.duration)
+        self.final_clip = CompositeVideoClip([self.final_clip, track.with_position(('center', 'bottom'))])
+        self._modified = True
         return self
 
-    def export(self, output_path: str):
-        if self.final_clip:
+    def _can_stream_copy(self) -> bool:
+        """모든 클립의 코덱/해상도/fps가 같고 목표 해상도와 일치하는지 확인"""
+        if self._modified or not self.clip_paths or not shutil.which("ffmpeg"):
+            return False
+        probes = [_probe_streams(p) for p in self.clip_paths]
+        if probes[0] is None or any(p != probes[0] for p in probes[1:]):
+            return False
+        video = [dict(s) for s in probes[0] if dict(s).get("codec_type") == "video"]
+        return bool(video) and (video[0].get("width"), video[0].get("height")) == tuple(self.target_res)
+
+    def _concat_copy(self, output_path: str, paths=None) -> bool:
+        """ffmpeg concat demuxer로 재인코딩 없이 병합"""
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            for path in paths or self.clip_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+            list_path = f.name
+        try:
+            subprocess.run(
+                ["ffmpeg", "-y", "-v", "error", "-f", "concat", "-safe", "0",
+                 "-i", list_path, "-c", "copy", output_path],
+                check=True
+            )
+            return True
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"   ⚠️ 스트림 복사 병합 실패, 재인코딩으로 진행: {e}")
+            return False
+        finally:
+            os.remove(list_path)
+
+    def _normalize_and_concat(self, output_path: str) -> bool:
+        """형식이 다른 클립을 각각 한 번씩만 정규화한 뒤 스트림 복사로 병합"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            normalized = [os.path.join(tmp_dir, f"norm_{i:03d}.mp4") for i in range(len(self.clip_paths))]
+            has_audio = [
+                any(dict(s).get("codec_type") == "audio" for s in (_probe_streams(p) or ()))
+                for p in self.clip_paths
+            ]
+            # 클립별 ffmpeg 인코딩은 서로 독립적인 외부 프로세스이므로 스레드로 동시에 실행
+            workers = min(len(self.clip_paths), os.cpu_count() or 1)
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as ex:
+                    resolutions = [self.target_res] * len(normalized)
+                    list(ex.map(_normalize_clip, self.clip_paths, normalized, resolutions, has_audio))
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"   ⚠️ 클립 정규화 실패, 재인코딩으로 진행: {e}")
+                return False
+            return self._concat_copy(output_path, normalized)
+
+    def export(self, output_path: str, preset=EXPORT_PRESET, crf=EXPORT_CRF, threads=None):
+        try:
+            self._export(output_path, preset, crf, threads)
+        finally:
+            # 스트림 복사로 끝나거나 렌더링이 실패해도 ffmpeg 리더 프로세스를 남기지 않음
+            self.close()
+
+    def _export(self, output_path, preset, crf, threads):
+        # 편집 없이 이어 붙이기만 하고 클립 형식이 모두 같으면 스트림 복사
+        if self._can_stream_copy():
+            print(f"⚡ 스트림 복사로 병합: {output_path}")
+            if self._concat_copy(output_path):
+                print("✅ 렌더링 완료!")
+                return
+        elif self._demuxer and not self._modified and self.clip_paths and shutil.which("ffmpeg"):
+            print(f"⚡ 클립 정규화 후 스트림 복사로 병합: {output_path}")
+            if self._normalize_and_concat(output_path):
+                print("✅ 렌더링 완료!")
+                return
+        # demuxer 경로가 불가능하면 MoviePy 합성으로 대체
+        if self._demuxer and self._concat_method is None:
+            self._demuxer = False
+            self._concat_method = "chain"
+        if self._build_final_clip():
             print(f"🚀 렌더링 시작: {output_path}")
+            # 하드웨어 인코더가 있으면 사용, 없으면 libx264 (전체 코어 사용)
+            codec = _pick_encoder()
+            if codec == "libx264":
+                params = ["-crf", str(crf)]
+            else:
+                # x264 프리셋 이름(veryfast 등)은 하드웨어 인코더에 넘기지 않음
+                preset = _HW_ENCODER_PRESETS[codec]
+                params = _HW_ENCODER_PARAMS[codec] + ["-pix_fmt", "yuv420p"]
+                print(f"   🖥️ 하드웨어 인코더 사용: {codec}")
+            # 목표 해상도와 다르면 ffmpeg scale 필터로 한 번에 맞춤 (비율 유지 + 여백)
+            if tuple(self.final_clip.size) != tuple(self.target_res):
+                w, h = self.target_res
+                params += ["-vf", f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                                  f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1"]
+            # faststart(moov 앞쪽 배치)로 업로드 후 처리 시작을 앞당김
             self.final_clip.write_videofile(
-                output_path, fps=24, codec='libx264', audio_codec='aac', logger=None
+                output_path, fps=24, codec=codec, audio_codec='aac',
+                preset=preset, threads=threads or os.cpu_count(),
+                ffmpeg_params=params + ["-movflags", "+faststart"],
+                logger=None
             )
             print("✅ 렌더링 완료!")
\ No newline at end of file
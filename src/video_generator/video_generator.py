@@ -1,26 +1,73 @@
 import time
 import os
+import asyncio
+import hashlib
 import io
-import requests  # 추가 필요
-from typing import List, Dict, Optional
+import json
+import random
+import shutil
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional
 from google import genai
 from google.genai import types
-from PIL import Image
+from google.genai import errors
+
+# Pillow는 PIL 이미지를 실제로 다룰 때만 import (VeoGenerator import 시간 단축)
+if TYPE_CHECKING:
+    from PIL import Image
+
+# 재시도할 HTTP 상태 코드 (요청 제한 / 일시적 서버 오류)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+
+# 작업 완료 폴링 간격 (지수 증가 + 지터, 상한 있음)
+POLL_INITIAL_DELAY = 2.0
+POLL_BACKOFF = 1.5
+POLL_MAX_DELAY = 15.0
+
+# 생성한 클립 캐시 (cache_dir을 지정했을 때만 사용) - 최근 파일만 이 개수까지 유지
+VIDEO_CACHE_MAX_FILES = 50
+
+@lru_cache(maxsize=4)
+def get_genai_client(api_key: str) -> genai.Client:
+    """API 키별 genai 클라이언트를 프로세스 전체에서 하나만 생성 (연결 풀 공유)"""
+    return genai.Client(api_key=api_key)
+
 
 class VeoGenerator:
-    def __init__(self, api_key: str, model_name: str = "veo-3.1-generate-preview"):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: str, model_name: str = "veo-3.1-generate-preview",
+                 cache_dir: Optional[str] = None):
+        if not api_key:
+            raise ValueError("❌ Veo API 키가 없습니다.")
+        self.client = get_genai_client(api_key)
         self.model_name = model_name.replace("models/", "")
+        self.cache_dir = cache_dir  # 같은 요청의 클립 재사용 폴더 (None이면 캐시 사용 안 함)
+        self._dirs = set()  # 이미 만든 폴더 (클립마다 makedirs 반복 방지)
+        if cache_dir:
+            self._ensure_dir(cache_dir)
         print(f"✅ VeoGenerator 초기화 (Paid Tier Mode: {self.model_name})")
 
-    def generate_image_from_text(self, prompt: str) -> Optional[Image.Image]:
+    def _ensure_dir(self, path: str):
+        """폴더가 없으면 생성 (인스턴스당 폴더별 한 번만 확인)"""
+        if path and path not in self._dirs:
+            os.makedirs(path, exist_ok=True)
+            self._dirs.add(path)
+
+    def generate_image_from_text(self, prompt: str) -> Optional["Image.Image"]:
         """제공된 리스트 중 가장 성공률 높은 Imagen 4.0 모델 사용"""
+        from PIL import Image
+
+        image = self._generate_start_image(prompt)
+        return Image.open(io.BytesIO(image.image_bytes)) if image else None
+
+    def _generate_start_image(self, prompt: str) -> Optional[types.Image]:
+        """Imagen 결과를 API가 준 바이트 그대로 반환 (Veo 요청에 디코딩/재인코딩 없이 전달)"""
         candidate_models = [
             'imagen-4.0-generate-001',      # 1순위: 정식 버전
             'imagen-4.0-fast-generate-001', # 2순위: 빠른 버전
             'imagen-4.0-generate-preview-06-06' # 3순위: 프리뷰
         ]
-        
+
         for model_id in candidate_models:
             try:
                 print(f"   🎨 이미지 생성 시도 중... ({model_id})")
@@ -29,27 +76,33 @@ class VeoGenerator:
                     prompt=prompt,
                     config=types.GenerateImagesConfig(number_of_images=1)
                 )
-                return Image.open(io.BytesIO(response.generated_images[0].image.image_bytes))
+                return response.generated_images[0].image
             except Exception as e:
                 print(f"   ⚠️ {model_id} 실패: {e}")
                 continue
         return None
 
+    def _video_kwargs(self, prompt: str, image_start=None) -> Dict:
+        """generate_videos 요청 인자 구성"""
+        kwargs = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "config": types.GenerateVideosConfig(aspect_ratio="9:16")
+        }
+
+        if isinstance(image_start, types.Image):
+            # Imagen이 준 이미지는 그대로 사용
+            kwargs["image"] = image_start
+        elif image_start:
+            buffered = io.BytesIO()
+            image_start.save(buffered, format="JPEG", quality=85)
+            kwargs["image"] = types.Image(image_bytes=buffered.getvalue(), mime_type="image/jpeg")
+        return kwargs
+
     def generate_video(self, prompt: str, output_path: str, image_start=None):
         try:
-            kwargs = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "config": types.GenerateVideosConfig(aspect_ratio="9:16")
-            }
-            
-            if image_start:
-                buffered = io.BytesIO()
-                image_start.save(buffered, format="JPEG")
-                kwargs["image"] = types.Image(image_bytes=buffered.getvalue(), mime_type="image/jpeg")
-
             # 비디오 생성 작업 시작
-            operation = self.client.models.generate_videos(**kwargs)
+            operation = self._submit_with_retry(**self._video_kwargs(prompt, image_start))
             # 완료될 때까지 기다리고 저장하는 함수 호출
             return self._wait_and_save(operation, output_path)
 
@@ -57,18 +110,65 @@ class VeoGenerator:
             print(f"❌ 에러 발생: {e}")
             return None
 
+    @staticmethod
+    def _retry_after(e: errors.APIError) -> Optional[float]:
+        """응답의 Retry-After 헤더(초)가 있으면 반환"""
+        headers = getattr(getattr(e, "response", None), "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))  # httpx/requests 헤더는 대소문자 구분 없음
+        except (TypeError, ValueError):
+            return None
+
+    def _submit_with_retry(self, **kwargs):
+        """429/5xx 응답은 서버가 알려준 시간(Retry-After)만큼, 없으면 지수 백오프로 재시도"""
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                return self.client.models.generate_videos(**kwargs)
+            except errors.APIError as e:
+                if e.code not in RETRYABLE_STATUS or attempt == MAX_RETRIES:
+                    raise
+                wait = self._retry_after(e)
+                if wait is None:
+                    wait = 2 ** attempt + random.uniform(0, 1)
+                print(f"   ⚠️ 일시적 오류({e.code}), {wait:.1f}초 후 재시도 ({attempt}/{MAX_RETRIES})")
+                time.sleep(wait)
+
     def _wait_and_save(self, operation, output_path: str):
         """작업이 완료될 때까지 대기하고 파일을 저장합니다."""
         print(f"   ⏳ 비디오 생성 대기 중... (타겟: {output_path})")
         
         # 1. 작업 완료 여부 확인 (Polling)
-        while not operation.done:
-            time.sleep(5)
+        for delay in self._poll_delays():
+            if operation.done:
+                break
+            time.sleep(delay)
             operation = self.client.operations.get(operation)
             print(".", end="", flush=True)
         
+        return self._save_result(operation, output_path)
+
+    async def _poll(self, operation):
+        """작업 완료까지 비동기로 폴링 (대기 중에는 스레드를 점유하지 않음)"""
+        for delay in self._poll_delays():
+            if operation.done:
+                break
+            await asyncio.sleep(delay)
+            operation = await asyncio.to_thread(self.client.operations.get, operation)
+            print(".", end="", flush=True)
+        return operation
+
+    @staticmethod
+    def _poll_delays():
+        """폴링 대기 시간 (2초부터 1.5배씩 늘려 15초까지, 동시 작업끼리 겹치지 않게 지터 추가)"""
+        delay = POLL_INITIAL_DELAY
+        while True:
+            yield delay + random.uniform(0, 0.25 * delay)
+            delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
+
+    def _save_result(self, operation, output_path: str):
+        """완료된 작업의 결과 영상을 다운로드해 저장합니다."""
         print(f"\n   ✨ 생성 완료! 다운로드 중...")
-        
+
         # 2. 결과물 가져오기
         if operation.result and operation.result.generated_videos:
             video_obj = operation.result.generated_videos[0].video
@@ -78,7 +178,7 @@ class VeoGenerator:
                 file_content = self.client.files.download(file=video_obj)
                 
                 # 폴더 생성 및 저장
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                self._ensure_dir(os.path.dirname(output_path))
                 with open(output_path, "wb") as f:
                     f.write(file_content)
                 print(f"   ✅ 저장 성공: {output_path}")
@@ -90,16 +190,125 @@ class VeoGenerator:
             print("   ❌ 생성 실패: 결과물이 없습니다.")
             return None
 
-    def run_batch(self, tasks: List[Dict], output_folder: str):
-        if not os.path.exists(output_folder): os.makedirs(output_folder)
-        
+    def run_batch(self, tasks: Iterable[Dict], output_folder: str, max_concurrent: int = 2) -> List[str]:
+        """클립들을 동시에 생성합니다. (동시 실행 수는 max_concurrent로 제한)"""
+        self._ensure_dir(output_folder)
+        # 제너레이터도 받을 수 있도록 한 번만 리스트로 변환
+        return asyncio.run(self._run_batch_async(list(tasks), output_folder, max_concurrent))
+
+    @staticmethod
+    def _task_key(task: Dict) -> tuple:
+        """공백/대소문자만 다른 프롬프트는 같은 클립으로 취급"""
+        prompt = " ".join((task.get("prompt") or "").split()).lower()
+        return (prompt, bool(task.get("gen_image_first")))
+
+    def _cache_path(self, task: Dict) -> Optional[str]:
+        """모델 + 정규화한 요청 내용의 해시로 캐시 파일 경로 결정"""
+        if not self.cache_dir:
+            return None
+        payload = json.dumps([self.model_name, *self._task_key(task)], ensure_ascii=False)
+        key = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.mp4")
+
+    @staticmethod
+    def _link_or_copy(src: str, dst: str):
+        """같은 디스크면 하드 링크(복사 없음), 안 되면 파일 복사"""
+        if os.path.exists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+
+    async def _run_batch_async(self, tasks: List[Dict], output_folder: str, max_concurrent: int) -> List[str]:
+        # 동일한 프롬프트는 한 번만 생성하고 나머지는 결과 파일을 복사
+        first_index = {}
+        duplicates = {}
         for i, task in enumerate(tasks):
+            key = self._task_key(task)
+            if key in first_index:
+                duplicates[i] = first_index[key]
+            else:
+                first_index[key] = i
+
+        # 할당량 보호: 클립 사이 고정 대기 대신 동시 요청 수를 제한
+        sem = asyncio.Semaphore(max_concurrent)
+        unique = list(first_index.values())
+        results = await asyncio.gather(
+            *(self._process_clip(i, tasks[i], output_folder, sem) for i in unique),
+            return_exceptions=True
+        )
+        outputs = dict(zip(unique, results))
+
+        for i, src in duplicates.items():
+            if isinstance(outputs[src], str):
+                dst = os.path.join(output_folder, f"clip_{i+1}.mp4")
+                self._link_or_copy(outputs[src], dst)
+                print(f"   ♻️ Clip {i+1}: Clip {src+1}과 동일한 프롬프트, 결과 복사")
+                outputs[i] = dst
+            else:
+                outputs[i] = outputs[src]
+
+        saved = []
+        for i in range(len(tasks)):
+            res = outputs[i]
+            if isinstance(res, Exception):
+                print(f"❌ Clip {i+1} 실패: {res}")
+            elif res:
+                saved.append(res)
+        print(f"\n📊 클립 생성 완료: {len(saved)}/{len(tasks)}")
+        return saved
+
+    async def _process_clip(self, i: int, task: Dict, output_folder: str, sem: asyncio.Semaphore) -> Optional[str]:
+        output_path = os.path.join(output_folder, f"clip_{i+1}.mp4")
+
+        # 이전 실행에서 같은 요청으로 만든 클립이 있으면 API 호출 없이 재사용
+        cache_path = self._cache_path(task)
+        if cache_path and os.path.exists(cache_path):
+            self._link_or_copy(cache_path, output_path)
+            # 사용 시각을 갱신해 자주 재사용되는 클립이 먼저 삭제되지 않도록 함 (LRU)
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
+            print(f"   ♻️ Clip {i+1}: 캐시된 영상 사용 ({os.path.basename(cache_path)})")
+            return output_path
+
+        # 이전 실행의 결과가 캐시와 하드 링크돼 있을 수 있으므로 덮어쓰기 전에 연결을 끊음
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        async with sem:
             print(f"\n🎬 Clip {i+1} 시작...")
-            img = self.generate_image_from_text(task.get("prompt")) if task.get("gen_image_first") else None
-            
-            # 여기서 비디오가 실제로 생성되어 저장될 때까지 기다립니다.
-            res = self.generate_video(task.get("prompt"), os.path.join(output_folder, f"clip_{i+1}.mp4"), img)
-            
-            if i < len(tasks) - 1:
-                print("   💤 할당량 보호를 위해 60초 대기...")
-                time.sleep(60)
\ No newline at end of file
+            img = None
+            if task.get("gen_image_first"):
+                img = await asyncio.to_thread(self._generate_start_image, task.get("prompt"))
+
+            # 요청/다운로드(블로킹 SDK 호출)만 스레드에서 실행하고, 완료 대기는 이벤트 루프에서 폴링
+            try:
+                kwargs = self._video_kwargs(task.get("prompt"), img)
+                operation = await asyncio.to_thread(self._submit_with_retry, **kwargs)
+                print(f"   ⏳ 비디오 생성 대기 중... (타겟: {output_path})")
+                operation = await self._poll(operation)
+                saved = await asyncio.to_thread(self._save_result, operation, output_path)
+            except Exception as e:
+                print(f"❌ 에러 발생: {e}")
+                return None
+
+        if saved and cache_path:
+            self._link_or_copy(saved, cache_path)
+            self._trim_cache()
+        return saved
+
+    def _trim_cache(self):
+        """캐시 폴더에 최근 사용한 VIDEO_CACHE_MAX_FILES개만 남기고 나머지 삭제 (mtime = 마지막 사용 시각)"""
+        with os.scandir(self.cache_dir) as it:
+            entries = [e for e in it if e.name.endswith(".mp4") and e.is_file()]
+        if len(entries) <= VIDEO_CACHE_MAX_FILES:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for e in entries[VIDEO_CACHE_MAX_FILES:]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass